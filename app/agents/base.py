@@ -158,7 +158,31 @@ class BaseAgent(ABC):
             success: Whether the action succeeded
             error: Error message if failed
         """
-        entry = AuditLogEntry(
+        entry = self._audit_entry(action, email_id, details, user_command, success, error)
+        self.db.log_audit(entry)
+        self._log_entry(entry)
+
+    def _log_entry(self, entry: AuditLogEntry) -> None:
+        """Write the application log line for an audit entry."""
+        log_msg = f"[{self.name}] {entry.action}"
+        if entry.email_id:
+            log_msg += f" (email: {entry.email_id[:8]}...)"
+        if entry.error:
+            logger.error(f"{log_msg} - ERROR: {entry.error}")
+        else:
+            logger.info(log_msg)
+
+    def _audit_entry(
+        self,
+        action: str,
+        email_id: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        user_command: Optional[str] = None,
+        success: bool = True,
+        error: Optional[str] = None
+    ) -> AuditLogEntry:
+        """Build an audit log entry for this agent without writing it."""
+        return AuditLogEntry(
             email_id=email_id,
             timestamp=datetime.utcnow(),
             agent=self.name,
@@ -168,15 +192,6 @@ class BaseAgent(ABC):
             success=success,
             error=error
         )
-        self.db.log_audit(entry)
-
-        log_msg = f"[{self.name}] {action}"
-        if email_id:
-            log_msg += f" (email: {email_id[:8]}...)"
-        if error:
-            logger.error(f"{log_msg} - ERROR: {error}")
-        else:
-            logger.info(log_msg)
 
 
 class AgentTool:
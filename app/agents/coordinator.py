@@ -25,6 +25,7 @@ from ..db import Database
 from ..models import EmailRecord, EmailState, EmailCategory, SpamRule, RuleAction
 from ..integrations import EmailClient, TeamsClient, MCPClient
 from ..config import settings
+from ..utils.matching import substring_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -102,17 +103,15 @@ def is_alert_email(email: EmailRecord) -> bool:
     """
     sender_email = email.sender_email.lower()
     sender_domain = sender_email.split('@')[-1] if '@' in sender_email else ""
-    subject_lower = email.subject.lower()
 
     # Check if sender domain is an alert/monitoring service
     for alert_domain in settings.alert_sender_domains:
-        if alert_domain.lower() in sender_domain:
+        if alert_domain in sender_domain:
             return True
 
     # Check if subject contains alert patterns
-    for pattern in settings.alert_subject_patterns:
-        if pattern.lower() in subject_lower:
-            return True
+    if substring_matcher(tuple(settings.alert_subject_patterns)).search(email.subject) is not None:
+        return True
 
     return False
 
@@ -677,7 +676,6 @@ class CoordinatorAgent(BaseAgent):
 
     async def _delete_spam(self, spam_emails: List[EmailRecord]) -> int:
         """Delete hard spam emails - no notification."""
-        deleted = 0
         for email in spam_emails:
             try:
                 # Move to Deleted Items folder
@@ -687,14 +685,14 @@ class CoordinatorAgent(BaseAgent):
                     sender_email=email.mailbox
                 )
                 email.transition_to(EmailState.ARCHIVED)
-                self.db.save_email(email)
-                deleted += 1
                 logger.info(f"Deleted spam: {email.subject[:50]} from {email.sender_email}")
             except Exception as e:
                 logger.warning(f"Could not delete spam: {e}")
                 email.transition_to(EmailState.ARCHIVED)
-                self.db.save_email(email)
-                deleted += 1
+
+        # Archived either way; save them in one transaction
+        self.db.save_emails(spam_emails)
+        deleted = len(spam_emails)
 
         if deleted > 0:
             self.log_action("spam_deleted", details={"count": deleted})
@@ -905,12 +903,14 @@ class CoordinatorAgent(BaseAgent):
             )
 
             # Mark these emails as notified (transition to ACKNOWLEDGED so they don't appear again)
+            acknowledged = []
             for email in newsletter_emails + fyi_emails:
                 try:
                     email.transition_to(EmailState.ACKNOWLEDGED)
-                    self.db.save_email(email)
+                    acknowledged.append(email)
                 except Exception:
                     pass  # Already in a terminal state, that's fine
+            self.db.save_emails(acknowledged)
 
         return message_id
 
@@ -1158,41 +1158,59 @@ class CoordinatorAgent(BaseAgent):
                 already_processed = 0
                 new_count = 0
 
-                for message in messages:
-                    message_id = message.get("id", "")
-
-                    # Skip if already processed
-                    if self.db.is_message_processed(message_id, mailbox):
-                        already_processed += 1
-                        continue
+                processed = self.db.get_processed_message_ids(
+                    [message.get("id", "") for message in messages], mailbox
+                )
+                ingested = []
+                fetched = []
+                audit = []
+                try:
+                    for message in messages:
+                        message_id = message.get("id", "")
+
+                        # Skip if already processed (or seen earlier in this
+                        # poll, which would upsert over the first row's id)
+                        if message_id in processed:
+                            already_processed += 1
+                            continue
+                        processed.add(message_id)
+
+                        new_count += 1
+                        subject = message.get("subject", "No Subject")[:50]
+                        logger.info(f"NEW email found: {subject} (id: {message_id[:30]}...)")
+
+                        # Fetch full email details (list response has truncated body)
+                        full_message = self.email_client.get_email_details(message_id, mailbox)
+                        if full_message:
+                            message = full_message
 
-                    new_count += 1
-                    subject = message.get("subject", "No Subject")[:50]
-                    logger.info(f"NEW email found: {subject} (id: {message_id[:30]}...)")
+                        # Convert to EmailRecord
+                        email = self.email_client.parse_email_to_record(message, mailbox)
 
-                    # Fetch full email details (list response has truncated body)
-                    full_message = self.email_client.get_email_details(message_id, mailbox)
-                    if full_message:
-                        message = full_message
+                        # Saved below, with the rest of this mailbox's batch
+                        fetched.append(email)
+                        ingested.append((message_id, mailbox))
 
-                    # Convert to EmailRecord
-                    email = self.email_client.parse_email_to_record(message, mailbox)
+                        new_emails.append(email)
 
-                    # Save to database
-                    self.db.save_email(email)
-                    self.db.mark_message_processed(message_id, mailbox)
-
-                    new_emails.append(email)
-
-                    self.log_action(
-                        "email_ingested",
-                        email_id=email.id,
-                        details={
-                            "subject": email.subject,
-                            "sender": email.sender_email,
-                            "mailbox": mailbox
-                        }
-                    )
+                        entry = self._audit_entry(
+                            "email_ingested",
+                            email_id=email.id,
+                            details={
+                                "subject": email.subject,
+                                "sender": email.sender_email,
+                                "mailbox": mailbox
+                            }
+                        )
+                        audit.append(entry)
+                        self._log_entry(entry)
+                finally:
+                    # One commit each for the whole poll; still records the
+                    # messages fetched before a failure. Emails go first so a
+                    # message is never marked processed without its row
+                    self.db.save_emails(fetched)
+                    self.db.mark_messages_processed(ingested)
+                    self.db.log_audits(audit)
 
                 # Log summary for this mailbox
                 logger.info(f"Mailbox {mailbox}: {len(messages)} fetched, {already_processed} already processed, {new_count} new")
@@ -1751,11 +1769,7 @@ Respond in JSON format."""
                 sender_domain = sender_lower.split('@')[1]
 
                 # Check if we already have a rule for this domain
-                existing_rules = self.db.get_active_spam_rules()
-                domain_rule = next(
-                    (r for r in existing_rules if r.rule_type == 'domain' and r.pattern == sender_domain),
-                    None
-                )
+                domain_rule = self.db.get_spam_rule_by_pattern('domain', sender_domain)
 
                 if domain_rule:
                     # Increase confidence of existing rule
@@ -7,12 +7,22 @@ This agent:
 - Executes rule actions (move to folder, forward, etc.)
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 
 from .base import BaseAgent
-from ..db import Database
+from ..config import settings
+from ..db import Database, EMAIL_HEADER_COLUMNS
 from ..models import EmailRecord, EmailRule, RuleAction
+from ..utils.matching import substring_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +52,102 @@ Be precise but reasonable:
 """
 
 
+# Evaluation results keyed by (match_prompt digest, email id, email updated_at).
+# An email that changes gets a new key, so entries never need invalidating.
+RULE_EVAL_CACHE_TTL = 3600.0
+RULE_EVAL_CACHE_SIZE = 10000
+_rule_eval_cache: "OrderedDict[Tuple[bytes, str, datetime], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _rule_digest(rule: EmailRule) -> bytes:
+    """Hash a rule's match prompt for use in cache keys."""
+    return hashlib.blake2b(rule.match_prompt.encode(), digest_size=16).digest()
+
+
+def _get_cached_evaluation(key: Tuple[bytes, str, datetime]) -> Optional[Dict[str, Any]]:
+    """Return a cached evaluation result, or None if missing or expired."""
+    entry = _rule_eval_cache.get(key)
+    if entry is None:
+        return None
+
+    expires, result = entry
+    if expires < time.monotonic():
+        del _rule_eval_cache[key]
+        return None
+
+    _rule_eval_cache.move_to_end(key)
+    return dict(result)
+
+
+def _cache_evaluation(key: Tuple[bytes, str, datetime], result: Dict[str, Any]) -> None:
+    """Store an evaluation result, evicting the least recently used entries."""
+    _rule_eval_cache[key] = (time.monotonic() + RULE_EVAL_CACHE_TTL, dict(result))
+    _rule_eval_cache.move_to_end(key)
+    while len(_rule_eval_cache) > RULE_EVAL_CACHE_SIZE:
+        _rule_eval_cache.popitem(last=False)
+
+
+# Evaluations under way, by cache key, so concurrent requests for the same
+# key wait for one Claude call instead of each making their own
+_rule_evals_in_flight: Dict[Tuple[bytes, str, datetime], "asyncio.Future[Dict[str, Any]]"] = {}
+
+
+def _claim_evaluation(key: Tuple[bytes, str, datetime]) -> "asyncio.Future[Dict[str, Any]]":
+    """Register the calling task as the one evaluating key."""
+    future = asyncio.get_running_loop().create_future()
+    _rule_evals_in_flight[key] = future
+    return future
+
+
+def _settle_evaluation(
+    key: Tuple[bytes, str, datetime],
+    future: "asyncio.Future[Dict[str, Any]]",
+    result: Optional[Dict[str, Any]],
+) -> None:
+    """Hand a claimed evaluation's result to its waiters (None = gave up)."""
+    if _rule_evals_in_flight.get(key) is future:
+        del _rule_evals_in_flight[key]
+    if result is None:
+        future.cancel()
+    else:
+        future.set_result(dict(result))
+
+
+async def _join_evaluation(future: "asyncio.Future[Dict[str, Any]]") -> Optional[Dict[str, Any]]:
+    """Wait for another task's evaluation; None if that task gave up."""
+    try:
+        return dict(await asyncio.shield(future))
+    except asyncio.CancelledError:
+        if future.cancelled():
+            return None
+        raise
+
+
+# Double-quoted literals in a match prompt ("..." or “...”)
+_QUOTED_TERM = re.compile(r'"([^"]+)"|“([^”]+)”')
+
+
+@lru_cache(maxsize=1000)
+def prefilter_terms(match_prompt: str) -> Tuple[str, ...]:
+    """
+    Get the quoted literals of a match prompt, lowercased.
+
+    Quoting a word in a rule makes it required: only emails containing at
+    least one quoted term (case-insensitive, in the sender, subject or
+    preview) are evaluated. Unquoted prompts yield no terms.
+    """
+    terms = (first or second for first, second in _QUOTED_TERM.findall(match_prompt))
+    return tuple(dict.fromkeys(term.strip().lower() for term in terms if term.strip()))
+
+
+def _prefilter_text(email: EmailRecord) -> str:
+    """The email text prefilter terms are searched in."""
+    return (
+        f"{email.sender_name or ''} {email.sender_email}\n"
+        f"{email.subject}\n{(email.body_preview or '')[:500]}"
+    )
+
+
 class RulesAgent(BaseAgent):
     """
     Agent for evaluating LLM-based email routing rules.
@@ -127,6 +233,31 @@ class RulesAgent(BaseAgent):
         Returns:
             Dict with matches (bool), confidence (int), reason (str)
         """
+        cache_key = (_rule_digest(rule), email.id, email.updated_at)
+        cached = _get_cached_evaluation(cache_key)
+        if cached is not None:
+            return cached
+
+        pending = _rule_evals_in_flight.get(cache_key)
+        if pending is not None:
+            result = await _join_evaluation(pending)
+            return result if result is not None else await self.evaluate_rule(email, rule)
+
+        future = _claim_evaluation(cache_key)
+        result = None
+        try:
+            result = await self._call_evaluate_rule(email, rule, cache_key)
+            return result
+        finally:
+            _settle_evaluation(cache_key, future, result)
+
+    async def _call_evaluate_rule(
+        self,
+        email: EmailRecord,
+        rule: EmailRule,
+        cache_key: Tuple[bytes, str, datetime]
+    ) -> Dict[str, Any]:
+        """Ask Claude whether an email matches a rule, caching a successful answer."""
         messages = [{
             "role": "user",
             "content": f"""Evaluate if this email matches the following rule condition:
@@ -137,7 +268,7 @@ RULE CONDITION:
 EMAIL DETAILS:
 From: {email.sender_name or ""} <{email.sender_email}>
 Subject: {email.subject}
-Preview: {email.body_preview[:500]}
+Preview: {(email.body_preview or '')[:500]}
 
 ---
 
@@ -152,7 +283,9 @@ Only output the JSON, nothing else."""
         }]
 
         try:
-            result = self.call_claude_structured(
+            # Run the blocking Claude call in a thread so evaluations can overlap
+            result = await asyncio.to_thread(
+                self.call_claude_structured,
                 messages,
                 response_schema={
                     "type": "object",
@@ -166,6 +299,7 @@ Only output the JSON, nothing else."""
                 max_tokens=200
             )
 
+            _cache_evaluation(cache_key, result)
             return result
 
         except Exception as e:
@@ -176,6 +310,206 @@ Only output the JSON, nothing else."""
                 "reason": f"Evaluation error: {str(e)}"
             }
 
+    def prefilter_emails(
+        self,
+        rule: EmailRule,
+        emails: List[EmailRecord]
+    ) -> List[EmailRecord]:
+        """
+        Drop emails that can't match the rule before any LLM evaluation.
+
+        Only quoted literals in the match prompt are used (see
+        prefilter_terms), so the skip is deterministic; a rule without any
+        is evaluated against every email.
+
+        Args:
+            rule: The rule to check
+            emails: Candidate emails
+
+        Returns:
+            Emails containing at least one quoted term (all emails if the
+            rule has none)
+        """
+        terms = prefilter_terms(rule.match_prompt)
+        if not terms:
+            return emails
+
+        matcher = substring_matcher(terms)
+        return [
+            email for email in emails
+            if matcher.search(_prefilter_text(email)) is not None
+        ]
+
+    async def evaluate_rule_batch(
+        self,
+        rule: EmailRule,
+        emails: List[EmailRecord]
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate a rule against several emails in a single Claude call.
+
+        Emails with a cached result are skipped, and emails another call is
+        already evaluating wait for that result; the rest are sent as a JSON
+        array keyed by position. Any email the response does not cover (or
+        the whole batch, if the response cannot be parsed) is evaluated
+        singly.
+
+        Args:
+            rule: The rule to check
+            emails: The emails to evaluate
+
+        Returns:
+            List of result dicts (matches, confidence, reason), one per email,
+            in the same order as emails
+        """
+        digest = _rule_digest(rule)
+        keys = [(digest, email.id, email.updated_at) for email in emails]
+        results: Dict[int, Dict[str, Any]] = {}
+        # Emails another evaluation is already working on, and the ones this
+        # batch claims for itself
+        joined: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        claimed: Dict[int, "asyncio.Future[Dict[str, Any]]"] = {}
+        for i, key in enumerate(keys):
+            cached = _get_cached_evaluation(key)
+            if cached is not None:
+                results[i] = cached
+            elif key in _rule_evals_in_flight:
+                joined[i] = _rule_evals_in_flight[key]
+            else:
+                claimed[i] = _claim_evaluation(key)
+
+        try:
+            if claimed:
+                await self._call_evaluate_rule_batch(rule, emails, keys, list(claimed), results)
+        finally:
+            for i, future in claimed.items():
+                _settle_evaluation(keys[i], future, results.get(i))
+
+        for i, future in joined.items():
+            result = await _join_evaluation(future)
+            results[i] = result if result is not None else await self.evaluate_rule(emails[i], rule)
+
+        return [results[i] for i in range(len(emails))]
+
+    async def _call_evaluate_rule_batch(
+        self,
+        rule: EmailRule,
+        emails: List[EmailRecord],
+        keys: List[Tuple[bytes, str, datetime]],
+        indexes: List[int],
+        results: Dict[int, Dict[str, Any]]
+    ) -> None:
+        """Evaluate emails[i] for each i in indexes in one Claude call, filling in results."""
+        batch = [
+            {
+                "id": i,
+                "from": f"{emails[i].sender_name or ''} <{emails[i].sender_email}>",
+                "subject": emails[i].subject,
+                "preview": (emails[i].body_preview or "")[:500],
+            }
+            for i in indexes
+        ]
+
+        messages = [{
+            "role": "user",
+            "content": f"""Evaluate if each of these emails matches the following rule condition:
+
+RULE CONDITION:
+"{rule.match_prompt}"
+
+EMAILS:
+{json.dumps(batch, indent=1)}
+
+---
+
+Respond with valid JSON containing one result per email, using the email's id:
+{{
+    "results": [
+        {{"id": 0, "matches": true or false, "confidence": 0-100, "reason": "brief explanation"}}
+    ]
+}}
+
+Only output the JSON, nothing else."""
+        }]
+
+        try:
+            response = await asyncio.to_thread(
+                self.call_claude_structured,
+                messages,
+                response_schema={
+                    "type": "object",
+                    "properties": {
+                        "results": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "id": {"type": "integer"},
+                                    "matches": {"type": "boolean"},
+                                    "confidence": {"type": "integer", "minimum": 0, "maximum": 100},
+                                    "reason": {"type": "string"}
+                                },
+                                "required": ["id", "matches", "confidence", "reason"]
+                            }
+                        }
+                    },
+                    "required": ["results"]
+                },
+                max_tokens=150 * len(batch) + 100
+            )
+
+            requested = {entry["id"] for entry in batch}
+            for item in response.get("results", []):
+                i = item.get("id")
+                if i in requested:
+                    results[i] = {
+                        "matches": bool(item.get("matches")),
+                        "confidence": int(item.get("confidence", 0)),
+                        "reason": item.get("reason", "")
+                    }
+                    _cache_evaluation(keys[i], results[i])
+
+        except Exception as e:
+            logger.warning(f"Batch rule evaluation failed for rule {rule.id}, falling back to single: {e}")
+
+        # These keys are claimed by this batch, so evaluate_rule would wait on itself
+        missing = [i for i in indexes if i not in results]
+        if missing:
+            fallback = await asyncio.gather(
+                *(self._call_evaluate_rule(emails[i], rule, keys[i]) for i in missing)
+            )
+            results.update(zip(missing, fallback))
+
+    async def evaluate_email_batch(
+        self,
+        rule: EmailRule,
+        emails: List[EmailRecord],
+        min_confidence: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate several emails against a rule - batch form of evaluate_single_email.
+
+        Args:
+            rule: The rule to check
+            emails: The emails to evaluate
+            min_confidence: Minimum confidence to consider a match
+
+        Returns:
+            List of dicts with matches (bool), confidence, reason - one per email
+        """
+        results = []
+        for result in await self.evaluate_rule_batch(rule, emails):
+            matches = result["matches"] and result["confidence"] >= min_confidence
+            if matches:
+                self.db.increment_email_rule_hit(rule.id)
+            results.append({
+                "matches": matches,
+                "confidence": result["confidence"],
+                "reason": result["reason"]
+            })
+
+        return results
+
     async def evaluate_single_email(
         self,
         rule: EmailRule,
@@ -303,7 +637,7 @@ Only output the JSON, nothing else."""
         Returns:
             Dict with test results
         """
-        recent_emails = self.db.get_recent_emails(hours=168, limit=limit)
+        recent_emails = self.db.get_recent_emails(hours=168, limit=limit, columns=EMAIL_HEADER_COLUMNS)
 
         matches = []
         non_matches = []
@@ -349,7 +683,7 @@ Only output the JSON, nothing else."""
 
 From: {email.sender_name or ""} <{email.sender_email}>
 Subject: {email.subject}
-Preview: {email.body_preview[:500]}
+Preview: {(email.body_preview or '')[:500]}
 
 Suggest 1-3 rules in this format:
 1. Rule Name: <name>
@@ -467,6 +801,10 @@ Only output the suggestions, no other text."""
         from ..integrations.mcp_email import EmailClient
 
         try:
+            # Callers may pass a header-only projection (EMAIL_HEADER_COLUMNS);
+            # reload the full row since some actions save the whole email
+            email = self.db.get_email(email.id) or email
+
             email_client = EmailClient()
 
             if rule.action == RuleAction.MOVE_TO_FOLDER:
@@ -13,6 +13,7 @@ from typing import Dict, Any, List, Optional, Tuple
 
 from .base import BaseAgent
 from ..config import settings
+from ..utils.matching import domain_suffixes, substring_matcher
 from ..db import Database
 from ..models import EmailRecord, EmailState, EmailCategory
 
@@ -232,20 +233,21 @@ class SpamFilterAgent(BaseAgent):
                 reasons.append(f"Sender matches '{pattern}'")
                 break
 
-        # Check sender domains from config (high confidence spam)
-        for domain in settings.spam_sender_domains:
-            if domain.lower() in sender_lower:
-                score += 80  # High score - these are definite spam
-                reasons.append(f"Sender domain matches spam domain '{domain}'")
-                break
+        # Check sender domains from config (high confidence spam); the most
+        # specific configured domain is the one reported
+        spam_domain = next(
+            (d for d in domain_suffixes(sender_lower) if d in settings.spam_sender_domains), None
+        )
+        if spam_domain is not None:
+            score += 80  # High score - these are definite spam
+            reasons.append(f"Sender domain matches spam domain '{spam_domain}'")
 
         # Check subject patterns from config (high confidence spam)
         subject_lower = email.subject.lower()
-        for pattern in settings.spam_subject_patterns:
-            if pattern.lower() in subject_lower:
-                score += 80  # High score - these are definite spam
-                reasons.append(f"Subject matches spam pattern '{pattern}'")
-                break
+        pattern = substring_matcher(tuple(settings.spam_subject_patterns)).search(email.subject)
+        if pattern is not None:
+            score += 80  # High score - these are definite spam
+            reasons.append(f"Subject matches spam pattern '{pattern}'")
 
         # Check for newsletter indicators
         newsletter_indicators = ["digest", "weekly", "newsletter", "update from", "your daily"]
@@ -414,14 +416,20 @@ Respond in JSON: spam_score, is_newsletter, reasoning"""
         Returns:
             Number of emails archived
         """
-        count = 0
+        archived = []
         for email in self._spam_batch:
             try:
                 email.transition_to(EmailState.ARCHIVED)
-                self.db.save_email(email)
-                count += 1
+                archived.append(email)
             except Exception as e:
                 logger.error(f"Failed to archive spam email {email.id}: {e}")
+        try:
+            self.db.save_emails(archived)
+        except Exception as e:
+            # Nothing was saved; the rows keep their old state
+            logger.error(f"Failed to save {len(archived)} archived spam emails: {e}")
+            archived = []
+        count = len(archived)
 
         self.log_action(
             "spam_batch_archived",
@@ -2,20 +2,33 @@
 API module for web dashboard.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
+from ..integrations.mcp_email import EmailClient
 from .routes import router, set_db
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one EmailClient (and its HTTP connection pool) across requests."""
+    app.state.email_client = EmailClient()
+    yield
+    email_client = getattr(app.state, "email_client", None)
+    if email_client:
+        email_client.close()
+
+
 def create_app(db=None) -> FastAPI:
     """Create and configure the FastAPI application."""
     app = FastAPI(
         title="Email AI Manager",
         description="AI-powered email management dashboard",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # CORS for local development
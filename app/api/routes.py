@@ -2,18 +2,31 @@
 FastAPI routes for the web dashboard.
 """
 
+import asyncio
+import base64
+import hashlib
+import inspect
+import json
 import logging
-from datetime import datetime
-from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query, Depends
+import time
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from typing import Any, Awaitable, Callable, Dict, Optional, List, Tuple
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
 from pydantic import BaseModel
+import anthropic
 
-from ..db import Database
-from ..models import EmailState, EmailCategory, SpamRule, EmailRecord, EmailRule, RuleAction
+from ..db import (
+    Database, EMAIL_HEADER_COLUMNS, EMAIL_ORDERINGS, EMAIL_SUMMARY_COLUMNS, ESTIMATE_COUNT_CAP,
+    PENDING_STATES,
+)
+from ..models import (
+    EmailState, EmailCategory, SpamRule, EmailRecord, EmailRule, RuleAction, transition_sources,
+)
 from ..config import settings
 from ..integrations.mcp_email import EmailClient
 from .schemas import (
-    EmailSummary, EmailDetail, EmailListResponse,
+    EmailDetail, EmailListResponse,
     AuditEntry, AuditLogResponse,
     StatsResponse,
     ActionResponse,
@@ -27,45 +40,117 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Settings are frozen after load, so values read on hot paths are bound once
+_DEFAULT_MAILBOX = settings.mailbox_email
+_TEAMS_CONFIGURED = bool(settings.teams_channel_id or settings.teams_chat_id)
+
 # Database dependency
-_db: Optional[Database] = None
+_db_override: Optional[Database] = None
 
 
+@lru_cache(maxsize=1)
 def get_db() -> Database:
-    """Get the database instance."""
-    global _db
-    if _db is None:
-        _db = Database(settings.db_path)
-    return _db
+    """Get the database instance (created once, then served from cache)."""
+    return _db_override or Database(settings.db_path, strict_projections=settings.debug)
 
 
 def set_db(db: Database):
     """Set the database instance (for dependency injection)."""
-    global _db
-    _db = db
+    global _db_override
+    _db_override = db
+    get_db.cache_clear()
+
+
+def get_email_client(request: Request) -> EmailClient:
+    """Get the app-wide EmailClient, so requests share one pooled MCP connection."""
+    email_client = getattr(request.app.state, "email_client", None)
+    if email_client is None:
+        email_client = request.app.state.email_client = EmailClient()
+    return email_client
+
+
+# Cache for rarely-changing GET responses: key -> (expires_at, etag, body)
+SPAM_RULES_CACHE_TTL = 30.0
+_response_cache: Dict[str, Tuple[float, str, BaseModel]] = {}
+
+
+async def _cached_response(key: str, ttl: float, build: Callable[[], BaseModel]) -> Tuple[BaseModel, str]:
+    """Get a response body and its ETag from the cache, building it on a miss."""
+    now = time.monotonic()
+    entry = _response_cache.get(key)
+    if entry is None or entry[0] <= now:
+        body = await asyncio.to_thread(build)
+        etag = f'"{hashlib.sha1(body.model_dump_json().encode()).hexdigest()}"'
+        entry = (now + ttl, etag, body)
+        _response_cache[key] = entry
+    return entry[2], entry[1]
+
+
+def _invalidate_cached_response(key: str):
+    """Drop a cached response after the data behind it changes."""
+    _response_cache.pop(key, None)
+
+
+def _etag_response(request: Request, response: Response, body: BaseModel, etag: str):
+    """Return 304 if the client already has this ETag, else the body with an ETag header."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return body
 
 
 # Helper functions
-def email_to_summary(email: EmailRecord) -> EmailSummary:
-    """Convert EmailRecord to EmailSummary."""
-    return EmailSummary(
-        id=email.id,
-        subject=email.subject,
-        sender_email=email.sender_email,
-        sender_name=email.sender_name,
-        state=email.state.value,
-        category=email.category.value if email.category else None,
-        priority=email.priority,
-        spam_score=email.spam_score,
-        received_at=email.received_at,
-        has_draft=bool(email.current_draft),
-        approval_token=email.approval_token,
-    )
+def email_to_summary(email: EmailRecord) -> Dict[str, Any]:
+    """
+    Convert EmailRecord to a plain EmailSummary dict.
+
+    List endpoints return these dicts and let the response_model validate and
+    serialize the whole page in one pass, instead of building a model per row.
+    """
+    return {
+        "id": email.id,
+        "subject": email.subject,
+        "sender_email": email.sender_email,
+        "sender_name": email.sender_name,
+        "state": email.state.value,
+        "category": email.category.value if email.category else None,
+        "priority": email.priority,
+        "spam_score": email.spam_score,
+        "received_at": email.received_at,
+        "has_draft": bool(email.current_draft),
+        "approval_token": email.approval_token,
+    }
+
+
+def email_list_response(
+    page_emails: List[EmailRecord],
+    total: Optional[int],
+    page: int,
+    page_size: int,
+    next_cursor: Optional[str],
+) -> Dict[str, Any]:
+    """Build an EmailListResponse body as a plain dict."""
+    return {
+        "emails": [email_to_summary(e) for e in page_emails],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "has_more": next_cursor is not None,
+        "next_cursor": next_cursor,
+    }
 
 
 def email_to_detail(email: EmailRecord) -> EmailDetail:
-    """Convert EmailRecord to EmailDetail."""
-    return EmailDetail(
+    """
+    Convert EmailRecord to EmailDetail.
+
+    Built with model_construct: the record comes from the database and is
+    already typed, so field validation would only repeat work.
+    """
+    return EmailDetail.model_construct(
         id=email.id,
         message_id=email.message_id,
         mailbox=email.mailbox,
@@ -78,7 +163,7 @@ def email_to_detail(email: EmailRecord) -> EmailDetail:
         body_preview=email.body_preview,
         body_full=email.body_full,
         received_at=email.received_at,
-        has_attachments=email.has_attachments,
+        has_attachments=bool(email.has_attachments),
         importance=email.importance,
         state=email.state.value,
         category=email.category.value if email.category else None,
@@ -96,116 +181,233 @@ def email_to_detail(email: EmailRecord) -> EmailDetail:
     )
 
 
+def email_rule_to_response(rule: EmailRule) -> EmailRuleResponse:
+    """Convert EmailRule to EmailRuleResponse (trusted DB values, so no validation)."""
+    return EmailRuleResponse.model_construct(
+        id=rule.id,
+        name=rule.name,
+        description=rule.description,
+        match_prompt=rule.match_prompt,
+        action=rule.action.value,
+        action_value=rule.action_value,
+        priority=rule.priority,
+        is_active=bool(rule.is_active),
+        stop_processing=bool(rule.stop_processing),
+        hit_count=rule.hit_count,
+        last_hit=rule.last_hit,
+        false_positives=rule.false_positives,
+        created_at=rule.created_at,
+        updated_at=rule.updated_at,
+    )
+
+
+def _encode_cursor(key: List[Any]) -> str:
+    """Encode an email sort key as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str, order: str) -> List[Any]:
+    """Decode a pagination cursor back into an email sort key for `order`."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    # A cursor from another ordering (or a hand-made one) would otherwise
+    # reach the keyset query and fail on its bindings. Null is a real value
+    # in ascending orderings (priority may be NULL); descending ones have
+    # NOT NULL keys
+    keys, direction = EMAIL_ORDERINGS[order]
+    value_types = (str, int, float) if direction == "DESC" else (str, int, float, type(None))
+    if (
+        not isinstance(key, list)
+        or len(key) != len(keys)
+        or not all(isinstance(value, value_types) for value in key)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+SLOW_ACTION_MS = 100
+
+
+def email_action(error_message: str, load_email: bool = True):
+    """
+    Decorate an email action endpoint with the shared boilerplate.
+
+    Resolves the email once (404 if missing) and passes it in as `email`,
+    turns unexpected errors into a logged 500, and logs actions slower than
+    SLOW_ACTION_MS. error_message is formatted with the email_id.
+    Endpoints that do their own single-statement lookup pass load_email=False.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(**kwargs):
+            email_id = kwargs["email_id"]
+            start = time.perf_counter_ns()
+            try:
+                if load_email:
+                    email = await asyncio.to_thread(kwargs["db"].get_email, email_id)
+                    if not email:
+                        raise HTTPException(status_code=404, detail="Email not found")
+                    kwargs["email"] = email
+                return await func(**kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.error(f"{error_message.format(email_id=email_id)}: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+            finally:
+                elapsed_ms = (time.perf_counter_ns() - start) / 1_000_000
+                if elapsed_ms > SLOW_ACTION_MS:
+                    logger.warning(f"Slow email action {func.__name__} for {email_id}: {elapsed_ms:.0f}ms")
+
+        # FastAPI reads the signature to resolve parameters; `email` is ours to fill
+        wrapper.__signature__ = signature.replace(
+            parameters=[p for name, p in signature.parameters.items() if name != "email"]
+        )
+        return wrapper
+    return decorator
+
+
+async def _paginate_emails(
+    db: Database,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    order: str = "recent",
+    **filters,
+) -> Tuple[List[EmailRecord], Optional[str]]:
+    """
+    Fetch one page of emails and the cursor for the next page.
+
+    Fetches page_size + 1 rows so the extra row tells us whether there is a
+    next page. ?page= is still honoured when no cursor is given. Only the
+    summary columns are loaded, so rows are only good for email_to_summary.
+    """
+    if cursor is None and page > 1:
+        logger.warning("Offset pagination (?page=) is deprecated, use ?cursor= instead")
+        rows = await asyncio.to_thread(
+            db.query_emails,
+            limit=page_size + 1, offset=(page - 1) * page_size, order=order,
+            columns=EMAIL_SUMMARY_COLUMNS, **filters
+        )
+    else:
+        after = _decode_cursor(cursor, order) if cursor else None
+        rows = await asyncio.to_thread(
+            db.query_emails,
+            limit=page_size + 1, order=order, after=after,
+            columns=EMAIL_SUMMARY_COLUMNS, **filters
+        )
+
+    page_emails = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        next_cursor = _encode_cursor(db.email_sort_key(page_emails[-1], order))
+    return page_emails, next_cursor
+
+
 # Email endpoints
 @router.get("/emails", response_model=EmailListResponse)
 async def list_emails(
     state: Optional[str] = Query(None, description="Filter by state"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, deprecated=True),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    exact_count: bool = Query(True, description="Exact total (false = capped estimate)"),
+    include_total: bool = Query(True, description="Count the total (false = skip; use has_more)"),
     db: Database = Depends(get_db),
 ):
     """List emails with optional filtering."""
-    # Get all pending emails for now (can be expanded later)
+    states = None
     if state:
         try:
-            state_enum = EmailState(state)
-            emails = db.get_emails_by_state(state_enum, limit=page_size * 10)
+            states = {EmailState(state)}
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid state: {state}")
-    else:
-        # Get recent emails + any pending/action emails regardless of age
-        recent_emails = db.get_recent_emails(hours=168, limit=page_size * 10)  # Last week
-        pending_emails = db.get_pending_emails()  # All pending regardless of age
-
-        # Merge and deduplicate
-        seen_ids = set()
-        emails = []
-        for e in pending_emails + recent_emails:
-            if e.id not in seen_ids:
-                seen_ids.add(e.id)
-                emails.append(e)
-
-        # Sort by received_at descending
-        emails.sort(key=lambda x: x.received_at or "", reverse=True)
-
-    # Filter by category if specified
+
+    cat_enum = None
     if category:
         try:
             cat_enum = EmailCategory(category)
-            emails = [e for e in emails if e.category == cat_enum]
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid category: {category}")
 
+    # Without a state filter, show recent emails + any pending/action emails regardless of age
+    recent_hours = None
+    if states is None:
+        states = set(PENDING_STATES)
+        recent_hours = 168  # Last week
+
     # Exclude spam/deleted emails from list (unless specifically filtering for them)
+    exclude_states = None
     if state not in ['spam_detected', 'ignored']:
-        emails = [e for e in emails if e.state not in [EmailState.SPAM_DETECTED, EmailState.IGNORED]]
-
-    # Paginate
-    total = len(emails)
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_emails = emails[start:end]
+        exclude_states = {EmailState.SPAM_DETECTED, EmailState.IGNORED}
 
-    return EmailListResponse(
-        emails=[email_to_summary(e) for e in page_emails],
-        total=total,
-        page=page,
-        page_size=page_size,
-        has_more=end < total,
+    # Filter, order and paginate in SQL
+    filters = dict(
+        states=states, exclude_states=exclude_states, category=cat_enum, recent_hours=recent_hours
     )
+    page_emails, next_cursor = await _paginate_emails(db, page, page_size, cursor, **filters)
+    total = None
+    if include_total:
+        # Estimated totals are capped, so count exactly once the page nears the
+        # cap. A cursor doesn't say how deep the page is, so there a capped
+        # estimate is replaced with the exact count
+        exact = exact_count or page * page_size >= ESTIMATE_COUNT_CAP
+        total = await asyncio.to_thread(db.count_emails, exact=exact, **filters)
+        if not exact and cursor is not None and total >= ESTIMATE_COUNT_CAP:
+            total = await asyncio.to_thread(db.count_emails, **filters)
+
+    return email_list_response(page_emails, total, page, page_size, next_cursor)
 
 
 @router.get("/emails/pending", response_model=EmailListResponse)
 async def list_pending_emails(
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, deprecated=True),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    include_total: bool = Query(True, description="Count the total (false = skip; use has_more)"),
     db: Database = Depends(get_db),
 ):
     """List emails awaiting action."""
-    emails = db.get_pending_emails()
-
-    total = len(emails)
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_emails = emails[start:end]
-
-    return EmailListResponse(
-        emails=[email_to_summary(e) for e in page_emails],
-        total=total,
-        page=page,
-        page_size=page_size,
-        has_more=end < total,
+    states = set(PENDING_STATES)
+    page_emails, next_cursor = await _paginate_emails(
+        db, page, page_size, cursor, order="priority", states=states
     )
+    total = None
+    if include_total:
+        total = await asyncio.to_thread(db.count_emails, states=states)
+
+    return email_list_response(page_emails, total, page, page_size, next_cursor)
 
 
 @router.get("/emails/followups", response_model=EmailListResponse)
 async def list_followup_emails(
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, deprecated=True),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    include_total: bool = Query(True, description="Count the total (false = skip; use has_more)"),
     db: Database = Depends(get_db),
 ):
     """List emails marked for follow-up."""
-    emails = db.get_all_followups()
-
-    total = len(emails)
-    start = (page - 1) * page_size
-    end = start + page_size
-    page_emails = emails[start:end]
-
-    return EmailListResponse(
-        emails=[email_to_summary(e) for e in page_emails],
-        total=total,
-        page=page,
-        page_size=page_size,
-        has_more=end < total,
+    states = {EmailState.FOLLOW_UP}
+    page_emails, next_cursor = await _paginate_emails(
+        db, page, page_size, cursor, order="follow_up", states=states
     )
+    total = None
+    if include_total:
+        total = await asyncio.to_thread(db.count_emails, states=states)
+
+    return email_list_response(page_emails, total, page, page_size, next_cursor)
 
 
 @router.get("/emails/{email_id}", response_model=EmailDetail)
 async def get_email(email_id: str, db: Database = Depends(get_db)):
     """Get full email details."""
-    email = db.get_email(email_id)
+    email = await asyncio.to_thread(db.get_email, email_id)
     if not email:
         raise HTTPException(status_code=404, detail="Email not found")
     return email_to_detail(email)
@@ -213,120 +415,136 @@ async def get_email(email_id: str, db: Database = Depends(get_db)):
 
 # Email actions
 @router.post("/emails/{email_id}/approve", response_model=ActionResponse)
+@email_action("Error approving email {email_id}", load_email=False)
 async def approve_email(email_id: str, db: Database = Depends(get_db)):
     """Approve and send an email draft."""
-    email = db.get_email(email_id)
-    if not email:
-        raise HTTPException(status_code=404, detail="Email not found")
-
-    if email.state != EmailState.AWAITING_APPROVAL:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Email is not awaiting approval (state: {email.state.value})"
-        )
-
-    if not email.current_draft:
-        raise HTTPException(status_code=400, detail="No draft to send")
-
     # Note: Actual sending happens through the coordinator agent
     # This just marks it for sending
-    try:
-        email.transition_to(EmailState.APPROVED)
-        db.save_email(email)
+    new_state = await asyncio.to_thread(
+        db.set_state,
+        email_id,
+        EmailState.APPROVED,
+        expected_states=transition_sources(EmailState.APPROVED),
+        require_draft=True,
+    )
 
-        return ActionResponse(
-            success=True,
-            message="Email approved for sending",
-            email_id=email_id,
-            new_state=email.state.value,
-        )
-    except Exception as e:
-        logger.error(f"Error approving email {email_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    if new_state is None:
+        # Nothing was updated - work out why for the error message
+        email = await asyncio.to_thread(db.get_email, email_id)
+        if not email:
+            raise HTTPException(status_code=404, detail="Email not found")
+        if email.state != EmailState.AWAITING_APPROVAL:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Email is not awaiting approval (state: {email.state.value})"
+            )
+        raise HTTPException(status_code=400, detail="No draft to send")
+
+    return ActionResponse(
+        success=True,
+        message="Email approved for sending",
+        email_id=email_id,
+        new_state=new_state.value,
+    )
 
 
 @router.post("/emails/{email_id}/ignore", response_model=ActionResponse)
+@email_action("Error ignoring email {email_id}", load_email=False)
 async def ignore_email(email_id: str, db: Database = Depends(get_db)):
     """Mark an email as ignored/dismissed - hides from dashboard without deleting from MS365."""
-    email = db.get_email(email_id)
-    if not email:
+    # Just mark as archived in the database - don't touch MS365. A user
+    # dismissal overrides the state machine, so any state is accepted
+    new_state = await asyncio.to_thread(db.set_state, email_id, EmailState.ARCHIVED, handled_by="user")
+    if new_state is None:
         raise HTTPException(status_code=404, detail="Email not found")
 
-    try:
-        # Just mark as archived in the database - don't touch MS365
-        email.state = EmailState.ARCHIVED
-        email.handled_by = "user"
-        db.save_email(email)
-
-        return ActionResponse(
-            success=True,
-            message="Email dismissed from dashboard",
-            email_id=email_id,
-            new_state="archived",
-        )
-    except Exception as e:
-        logger.error(f"Error ignoring email {email_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return ActionResponse(
+        success=True,
+        message="Email dismissed from dashboard",
+        email_id=email_id,
+        new_state=new_state.value,
+    )
 
 
 @router.post("/emails/{email_id}/fyi", response_model=ActionResponse)
+@email_action("Error marking email {email_id} as FYI", load_email=False)
 async def mark_fyi(email_id: str, db: Database = Depends(get_db)):
     """Mark an email as FYI (informational, no action needed)."""
-    email = db.get_email(email_id)
-    if not email:
-        raise HTTPException(status_code=404, detail="Email not found")
-
-    try:
-        email.category = EmailCategory.FYI
-        email.transition_to(EmailState.FYI_NOTIFIED)
-        email.transition_to(EmailState.ACKNOWLEDGED)
-        email.handled_by = "user"
-        db.save_email(email)
-
-        return ActionResponse(
-            success=True,
-            message="Email marked as FYI",
-            email_id=email_id,
-            new_state=email.state.value,
+    # Same path transition_to would take: via FYI_NOTIFIED to ACKNOWLEDGED
+    new_state = await asyncio.to_thread(
+        db.set_state,
+        email_id,
+        EmailState.ACKNOWLEDGED,
+        handled_by="user",
+        category=EmailCategory.FYI,
+        expected_states=transition_sources(EmailState.FYI_NOTIFIED, EmailState.ACKNOWLEDGED),
+    )
+    if new_state is None:
+        coords = await asyncio.to_thread(db.get_message_coords, email_id)
+        if not coords:
+            raise HTTPException(status_code=404, detail="Email not found")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot mark email as FYI (state: {coords['state']})"
         )
-    except Exception as e:
-        logger.error(f"Error marking email {email_id} as FYI: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+    return ActionResponse(
+        success=True,
+        message="Email marked as FYI",
+        email_id=email_id,
+        new_state=new_state.value,
+    )
 
 
 class RegenerateDraftRequest(BaseModel):
     instructions: str
 
 
-@router.post("/emails/{email_id}/regenerate-draft", response_model=ActionResponse)
-async def regenerate_draft(email_id: str, request: RegenerateDraftRequest, db: Database = Depends(get_db)):
-    """Regenerate or create a draft reply based on user instructions."""
-    email = db.get_email(email_id)
-    if not email:
-        raise HTTPException(status_code=404, detail="Email not found")
-
-    try:
-        import anthropic
-
-        client = anthropic.Anthropic()
-
-        # Build context for Claude
-        prompt = f"""You are drafting an email reply for David at SkyComm (an IT services company).
+REGENERATE_DRAFT_PROMPT = """You are drafting an email reply for David at SkyComm (an IT services company).
 
 Original email:
-From: {email.sender_name or email.sender_email} <{email.sender_email}>
-Subject: {email.subject}
+From: {sender_name} <{sender_email}>
+Subject: {subject}
 Body:
-{email.body_full or email.body_preview}
+{body}
 
-{f"Current draft reply:{chr(10)}{email.current_draft}" if email.current_draft else "No draft yet."}
+{current_draft}
 
-User's instructions: {request.instructions}
+User's instructions: {instructions}
 
 Write a professional email reply based on the user's instructions. Keep it concise and appropriate for a business context.
 Just output the email body text - no subject line, no "Subject:" prefix, no email headers. Start directly with the greeting."""
 
-        response = client.messages.create(
+
+@lru_cache(maxsize=1)
+def _get_anthropic_client() -> anthropic.Anthropic:
+    """Get the shared Anthropic client (thread-safe, reused across requests)."""
+    return anthropic.Anthropic(api_key=settings.anthropic_api_key)
+
+
+@router.post("/emails/{email_id}/regenerate-draft", response_model=ActionResponse)
+async def regenerate_draft(email_id: str, request: RegenerateDraftRequest, db: Database = Depends(get_db)):
+    """Regenerate or create a draft reply based on user instructions."""
+    email = await asyncio.to_thread(db.get_email, email_id)
+    if not email:
+        raise HTTPException(status_code=404, detail="Email not found")
+
+    try:
+        # Build context for Claude
+        prompt = REGENERATE_DRAFT_PROMPT.format_map({
+            "sender_name": email.sender_name or email.sender_email,
+            "sender_email": email.sender_email,
+            "subject": email.subject,
+            "body": email.body_full or email.body_preview,
+            "current_draft": (
+                f"Current draft reply:\n{email.current_draft}" if email.current_draft else "No draft yet."
+            ),
+            "instructions": request.instructions,
+        })
+
+        # Run the blocking Claude call off the event loop
+        response = await asyncio.to_thread(
+            _get_anthropic_client().messages.create,
             model="claude-sonnet-4-20250514",
             max_tokens=1024,
             messages=[{"role": "user", "content": prompt}]
@@ -339,7 +557,7 @@ Just output the email body text - no subject line, no "Subject:" prefix, no emai
         if email.state == EmailState.NEW:
             email.transition_to(EmailState.PROCESSING)
         email.transition_to(EmailState.AWAITING_APPROVAL)
-        db.save_email(email)
+        await asyncio.to_thread(db.save_email, email)
 
         return ActionResponse(
             success=True,
@@ -355,71 +573,69 @@ Just output the email body text - no subject line, no "Subject:" prefix, no emai
 @router.post("/emails/{email_id}/dismiss", response_model=ActionResponse)
 async def dismiss_email(email_id: str, db: Database = Depends(get_db)):
     """Alias for ignore - hides from dashboard without deleting from MS365."""
-    return await ignore_email(email_id, db)
+    return await ignore_email(email_id=email_id, db=db)
 
 
 @router.post("/emails/{email_id}/delete", response_model=ActionResponse)
-async def delete_email(email_id: str, db: Database = Depends(get_db)):
+@email_action("Error deleting email {email_id}", load_email=False)
+async def delete_email(
+    email_id: str,
+    db: Database = Depends(get_db),
+    email_client: EmailClient = Depends(get_email_client),
+):
     """Delete a single email without blocking sender."""
-    email = db.get_email(email_id)
-    if not email:
+    coords = await asyncio.to_thread(db.get_message_coords, email_id)
+    if not coords:
         raise HTTPException(status_code=404, detail="Email not found")
 
-    try:
-        email_client = EmailClient()
-
-        # Delete from MS365 - this MUST succeed
-        deleted = email_client.delete_email(email.message_id, email.mailbox)
-        if not deleted:
-            logger.error(f"Failed to delete email {email_id} from MS365")
-            return ActionResponse(
-                success=False,
-                message="Failed to delete email from mailbox",
-                email_id=email_id,
-                new_state=email.state.value,
-            )
-
-        # Only mark as ignored AFTER successful MS365 delete
-        email.state = EmailState.IGNORED
-        db.save_email(email)
-
+    # Delete from MS365 - this MUST succeed
+    deleted = await asyncio.to_thread(email_client.delete_email, coords["message_id"], coords["mailbox"])
+    if not deleted:
+        logger.error(f"Failed to delete email {email_id} from MS365")
         return ActionResponse(
-            success=True,
-            message="Email deleted",
+            success=False,
+            message="Failed to delete email from mailbox",
             email_id=email_id,
-            new_state="deleted",
+            new_state=coords["state"],
         )
-    except Exception as e:
-        logger.error(f"Error deleting email {email_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+
+    # Only mark as ignored AFTER successful MS365 delete; the message is
+    # gone, so any state is accepted
+    await asyncio.to_thread(db.set_state, email_id, EmailState.IGNORED)
+
+    return ActionResponse(
+        success=True,
+        message="Email deleted",
+        email_id=email_id,
+        new_state="deleted",
+    )
 
 
 @router.post("/emails/{email_id}/spam", response_model=ActionResponse)
-async def mark_spam(email_id: str, db: Database = Depends(get_db)):
+async def mark_spam(
+    email_id: str,
+    db: Database = Depends(get_db),
+    email_client: EmailClient = Depends(get_email_client),
+):
     """Mark an email as spam, delete it from MS365, and block sender."""
-    email = db.get_email(email_id)
+    email = await asyncio.to_thread(db.get_message_coords, email_id)
     if not email:
         raise HTTPException(status_code=404, detail="Email not found")
 
     try:
-        email_client = EmailClient()
-        deleted_count = 0
+        similar_deleted = 0
 
         # Extract sender domain for finding similar emails
         sender_domain = None
-        if '@' in email.sender_email.lower():
-            sender_domain = email.sender_email.lower().split('@')[1]
+        if '@' in email["sender_email"].lower():
+            sender_domain = email["sender_email"].lower().split('@')[1]
 
         # Learn spam pattern - create/update domain rule
         if sender_domain:
-            existing_rules = db.get_active_spam_rules()
-            domain_rule = next(
-                (r for r in existing_rules if r.rule_type == 'domain' and r.pattern == sender_domain),
-                None
-            )
+            domain_rule = await asyncio.to_thread(db.get_spam_rule_by_pattern, 'domain', sender_domain)
 
             if domain_rule:
-                db.increment_spam_rule_hit(domain_rule.id)
+                await asyncio.to_thread(db.increment_spam_rule_hit, domain_rule.id)
                 logger.info(f"Increased confidence for spam domain rule: {sender_domain}")
             else:
                 new_rule = SpamRule(
@@ -428,44 +644,66 @@ async def mark_spam(email_id: str, db: Database = Depends(get_db)):
                     action='delete',  # Delete action for user-marked spam
                     confidence=80,  # Higher confidence since user marked it
                 )
-                db.save_spam_rule(new_rule)
+                await asyncio.to_thread(db.save_spam_rule, new_rule)
                 logger.info(f"Created new spam domain rule: {sender_domain}")
+            _invalidate_cached_response("spam-rules")
 
         # Find similar emails from the same domain in our database
         if sender_domain:
-            all_emails = db.get_recent_emails(hours=168, limit=500)  # Get recent emails
-            similar_emails = [
-                e for e in all_emails
-                if e.sender_email.lower().endswith(f"@{sender_domain}")
-                and e.id != email_id
-                and e.state not in [EmailState.ARCHIVED, EmailState.SPAM_DETECTED]
-            ]
+            similar_emails = await asyncio.to_thread(
+                db.find_emails_by_domain,
+                sender_domain,
+                exclude_id=email_id,
+                exclude_states={EmailState.ARCHIVED, EmailState.SPAM_DETECTED},
+                hours=168,
+                limit=500,
+            )
 
-            # Delete similar emails from MS365 and from our database
-            for similar in similar_emails:
-                try:
-                    # Delete from MS365
-                    email_client.delete_email(similar.message_id, similar.mailbox)
-                    # Delete from our database
-                    db.delete_email(similar.id)
-                    deleted_count += 1
-                    logger.info(f"Deleted similar spam from {similar.sender_email}: {similar.subject[:50]}")
-                except Exception as e:
-                    logger.warning(f"Could not delete similar email {similar.id}: {e}")
+            if similar_emails:
+                # Delete similar emails from MS365 and from our database
+                deleted = await email_client.delete_emails_batch(
+                    [(message_id, mailbox) for _, message_id, mailbox in similar_emails]
+                )
+                if len(deleted) < len(similar_emails):
+                    logger.warning(
+                        f"Could not delete {len(similar_emails) - len(deleted)} similar emails "
+                        f"from {sender_domain} in MS365"
+                    )
+                # Only drop rows whose message left MS365; the rest stay so
+                # they can still be acted on
+                row_ids = {message_id: similar_id for similar_id, message_id, _ in similar_emails}
+                similar_deleted = await asyncio.to_thread(
+                    db.delete_emails, [row_ids[message_id] for message_id in deleted]
+                )
+                logger.info(f"Deleted {len(deleted)} similar spam emails from {sender_domain}")
 
         # Delete the original email from MS365
         try:
-            email_client.delete_email(email.message_id, email.mailbox)
-            deleted_count += 1
+            original_deleted = await asyncio.to_thread(
+                email_client.delete_email, email["message_id"], email["mailbox"]
+            )
         except Exception as e:
-            logger.warning(f"Could not delete original email from MS365: {e}")
+            logger.warning(f"Could not delete original email from MS365: {e}", exc_info=True)
+            original_deleted = False
+
+        # Same rule as the similar emails: only drop the row once the
+        # message has left MS365, so it can still be deleted later
+        if not original_deleted:
+            message = "Sender blocked, but the email could not be deleted from the mailbox"
+            if similar_deleted:
+                message += f" ({similar_deleted} similar emails deleted)"
+            return ActionResponse(
+                success=False,
+                message=message,
+                email_id=email_id,
+                new_state=email["state"],
+            )
 
-        # Delete from our database too
-        db.delete_email(email_id)
+        await asyncio.to_thread(db.delete_email, email_id)
 
         message = f"Email marked as spam and deleted"
-        if deleted_count > 1:
-            message += f" ({deleted_count} similar emails also deleted)"
+        if similar_deleted:
+            message += f" ({similar_deleted} similar emails also deleted)"
 
         return ActionResponse(
             success=True,
@@ -479,60 +717,47 @@ async def mark_spam(email_id: str, db: Database = Depends(get_db)):
 
 
 @router.post("/emails/{email_id}/followup", response_model=ActionResponse)
+@email_action("Error setting follow-up for email {email_id}")
 async def mark_followup(
     email_id: str,
+    email: EmailRecord,
     days: int = Query(1, ge=1, le=30, description="Days until follow-up reminder"),
     note: Optional[str] = Query(None, description="Optional note"),
     db: Database = Depends(get_db),
 ):
     """Mark an email for follow-up with a reminder."""
-    email = db.get_email(email_id)
-    if not email:
-        raise HTTPException(status_code=404, detail="Email not found")
-
-    try:
-        from datetime import timedelta
-
-        email.state = EmailState.FOLLOW_UP
-        email.follow_up_at = datetime.utcnow() + timedelta(days=days)
-        email.follow_up_note = note
-        email.handled_by = "user"
-        db.save_email(email)
-
-        return ActionResponse(
-            success=True,
-            message=f"Follow-up reminder set for {days} day(s)",
-            email_id=email_id,
-            new_state="follow_up",
-        )
-    except Exception as e:
-        logger.error(f"Error setting follow-up for email {email_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    from datetime import timedelta
+
+    email.state = EmailState.FOLLOW_UP
+    email.follow_up_at = datetime.utcnow() + timedelta(days=days)
+    email.follow_up_note = note
+    email.handled_by = "user"
+    await asyncio.to_thread(db.save_email, email)
+
+    return ActionResponse(
+        success=True,
+        message=f"Follow-up reminder set for {days} day(s)",
+        email_id=email_id,
+        new_state="follow_up",
+    )
 
 
 @router.post("/emails/{email_id}/clear-followup", response_model=ActionResponse)
-async def clear_followup(email_id: str, db: Database = Depends(get_db)):
+@email_action("Error clearing follow-up for email {email_id}")
+async def clear_followup(email_id: str, email: EmailRecord, db: Database = Depends(get_db)):
     """Clear follow-up status (mark as done)."""
-    email = db.get_email(email_id)
-    if not email:
-        raise HTTPException(status_code=404, detail="Email not found")
-
-    try:
-        email.state = EmailState.ARCHIVED
-        email.follow_up_at = None
-        email.follow_up_note = None
-        email.handled_by = "user"
-        db.save_email(email)
-
-        return ActionResponse(
-            success=True,
-            message="Follow-up completed",
-            email_id=email_id,
-            new_state="archived",
-        )
-    except Exception as e:
-        logger.error(f"Error clearing follow-up for email {email_id}: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    email.state = EmailState.ARCHIVED
+    email.follow_up_at = None
+    email.follow_up_note = None
+    email.handled_by = "user"
+    await asyncio.to_thread(db.save_email, email)
+
+    return ActionResponse(
+        success=True,
+        message="Follow-up completed",
+        email_id=email_id,
+        new_state="archived",
+    )
 
 
 # Audit log endpoints
@@ -541,16 +766,25 @@ async def get_audit_log(
     email_id: Optional[str] = Query(None, description="Filter by email ID"),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    exact_count: bool = Query(True, description="Exact total (false = capped estimate)"),
     db: Database = Depends(get_db),
 ):
     """Get audit log entries."""
     offset = (page - 1) * page_size
-    entries = db.get_audit_log(email_id=email_id, limit=page_size, offset=offset)
-    total = db.get_audit_log_count(email_id=email_id)
+    if exact_count or offset + page_size >= ESTIMATE_COUNT_CAP:
+        # Page and exact total in one query
+        entries, total = await asyncio.to_thread(
+            db.get_audit_log_page, email_id=email_id, limit=page_size, offset=offset
+        )
+    else:
+        entries = await asyncio.to_thread(
+            db.get_audit_log, email_id=email_id, limit=page_size, offset=offset
+        )
+        total = await asyncio.to_thread(db.get_audit_log_count, email_id=email_id, exact=False)
 
     # Convert to response format
     audit_entries = [
-        AuditEntry(
+        AuditEntry.model_construct(
             id=e.id,
             email_id=e.email_id,
             timestamp=e.timestamp,
@@ -579,15 +813,15 @@ async def get_stats(
     db: Database = Depends(get_db),
 ):
     """Get email processing statistics."""
-    stats = db.get_stats(hours=hours)
-    pending = db.get_pending_emails()
+    stats = await asyncio.to_thread(db.get_stats, hours=hours)
+    pending_count = await asyncio.to_thread(db.count_emails, states=set(PENDING_STATES))
 
     return StatsResponse(
         total_emails=stats.get("total_emails", 0),
         by_state=stats.get("by_state", {}),
         emails_sent=stats.get("emails_sent", 0),
         spam_filtered=stats.get("spam_filtered", 0),
-        pending_count=len(pending),
+        pending_count=pending_count,
         period_hours=hours,
     )
 
@@ -598,12 +832,12 @@ async def get_advanced_stats(
     db: Database = Depends(get_db),
 ):
     """Get detailed analytics for the dashboard."""
-    stats = db.get_advanced_stats(hours=hours)
-    pending = db.get_pending_emails()
+    stats = await asyncio.to_thread(db.get_advanced_stats, hours=hours)
+    pending_count = await asyncio.to_thread(db.count_emails, states=set(PENDING_STATES))
 
     return {
         **stats,
-        "pending_count": len(pending),
+        "pending_count": pending_count,
         "period_hours": hours,
     }
 
@@ -615,7 +849,7 @@ async def get_sender_stats(
     db: Database = Depends(get_db),
 ):
     """Get statistics for a specific sender."""
-    stats = db.get_sender_stats(sender_email, hours=hours)
+    stats = await asyncio.to_thread(db.get_sender_stats, sender_email, hours=hours)
     return {
         "sender_email": sender_email,
         "period_hours": hours,
@@ -624,9 +858,8 @@ async def get_sender_stats(
 
 
 # Spam rules endpoints
-@router.get("/spam-rules", response_model=SpamRulesResponse)
-async def list_spam_rules(db: Database = Depends(get_db)):
-    """List all spam rules."""
+def _spam_rules_response(db: Database) -> SpamRulesResponse:
+    """Build the spam rules list."""
     rules = db.get_active_spam_rules()
 
     return SpamRulesResponse(
@@ -648,6 +881,15 @@ async def list_spam_rules(db: Database = Depends(get_db)):
     )
 
 
+@router.get("/spam-rules", response_model=SpamRulesResponse)
+async def list_spam_rules(request: Request, response: Response, db: Database = Depends(get_db)):
+    """List all spam rules."""
+    body, etag = await _cached_response(
+        "spam-rules", SPAM_RULES_CACHE_TTL, lambda: _spam_rules_response(db)
+    )
+    return _etag_response(request, response, body, etag)
+
+
 @router.post("/spam-rules", response_model=SpamRuleResponse)
 async def create_spam_rule(
     request: CreateSpamRuleRequest,
@@ -662,6 +904,7 @@ async def create_spam_rule(
     )
 
     db.save_spam_rule(rule)
+    _invalidate_cached_response("spam-rules")
 
     return SpamRuleResponse(
         id=rule.id,
@@ -681,7 +924,7 @@ async def create_spam_rule(
 @router.get("/muted-senders", response_model=MutedSendersResponse)
 async def list_muted_senders(db: Database = Depends(get_db)):
     """List all muted senders."""
-    senders = db.get_muted_senders()
+    senders = await asyncio.to_thread(db.get_muted_senders)
 
     return MutedSendersResponse(
         senders=[
@@ -723,6 +966,7 @@ async def delete_spam_rule(rule_id: str, db: Database = Depends(get_db)):
     """Delete a spam rule."""
     try:
         db.delete_spam_rule(rule_id)
+        _invalidate_cached_response("spam-rules")
         return {"success": True, "message": "Spam rule deleted"}
     except Exception as e:
         logger.error(f"Error deleting spam rule {rule_id}: {e}")
@@ -730,9 +974,8 @@ async def delete_spam_rule(rule_id: str, db: Database = Depends(get_db)):
 
 
 # Settings endpoint
-@router.get("/settings", response_model=SettingsResponse)
-async def get_settings():
-    """Get current settings (read-only view)."""
+def _settings_response() -> SettingsResponse:
+    """Build the settings view."""
     return SettingsResponse(
         poll_interval_seconds=settings.poll_interval_seconds,
         mailbox_email=settings.mailbox_email,
@@ -747,6 +990,14 @@ async def get_settings():
     )
 
 
+@router.get("/settings", response_model=SettingsResponse)
+async def get_settings(request: Request, response: Response):
+    """Get current settings (read-only view)."""
+    # Settings are read-only while running, so the cached view never expires
+    body, etag = await _cached_response("settings", float("inf"), _settings_response)
+    return _etag_response(request, response, body, etag)
+
+
 # Email Rules endpoints (LLM-based routing)
 @router.get("/email-rules", response_model=EmailRulesResponse)
 async def list_email_rules(
@@ -755,28 +1006,13 @@ async def list_email_rules(
 ):
     """List all email routing rules."""
     if include_inactive:
-        rules = db.get_all_email_rules()
+        rules = await asyncio.to_thread(db.get_all_email_rules)
     else:
-        rules = db.get_active_email_rules()
+        rules = await asyncio.to_thread(db.get_active_email_rules)
 
     return EmailRulesResponse(
         rules=[
-            EmailRuleResponse(
-                id=r.id,
-                name=r.name,
-                description=r.description,
-                match_prompt=r.match_prompt,
-                action=r.action.value,
-                action_value=r.action_value,
-                priority=r.priority,
-                is_active=r.is_active,
-                stop_processing=r.stop_processing,
-                hit_count=r.hit_count,
-                last_hit=r.last_hit,
-                false_positives=r.false_positives,
-                created_at=r.created_at,
-                updated_at=r.updated_at,
-            )
+            email_rule_to_response(r)
             for r in rules
         ]
     )
@@ -789,22 +1025,7 @@ async def get_email_rule(rule_id: str, db: Database = Depends(get_db)):
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
 
-    return EmailRuleResponse(
-        id=rule.id,
-        name=rule.name,
-        description=rule.description,
-        match_prompt=rule.match_prompt,
-        action=rule.action.value,
-        action_value=rule.action_value,
-        priority=rule.priority,
-        is_active=rule.is_active,
-        stop_processing=rule.stop_processing,
-        hit_count=rule.hit_count,
-        last_hit=rule.last_hit,
-        false_positives=rule.false_positives,
-        created_at=rule.created_at,
-        updated_at=rule.updated_at,
-    )
+    return email_rule_to_response(rule)
 
 
 @router.post("/email-rules", response_model=EmailRuleResponse)
@@ -835,22 +1056,7 @@ async def create_email_rule(
     db.save_email_rule(rule)
     logger.info(f"Created email rule: {rule.name} ({rule.id})")
 
-    return EmailRuleResponse(
-        id=rule.id,
-        name=rule.name,
-        description=rule.description,
-        match_prompt=rule.match_prompt,
-        action=rule.action.value,
-        action_value=rule.action_value,
-        priority=rule.priority,
-        is_active=rule.is_active,
-        stop_processing=rule.stop_processing,
-        hit_count=rule.hit_count,
-        last_hit=rule.last_hit,
-        false_positives=rule.false_positives,
-        created_at=rule.created_at,
-        updated_at=rule.updated_at,
-    )
+    return email_rule_to_response(rule)
 
 
 @router.put("/email-rules/{rule_id}", response_model=EmailRuleResponse)
@@ -893,22 +1099,7 @@ async def update_email_rule(
     db.save_email_rule(rule)
     logger.info(f"Updated email rule: {rule.name} ({rule.id})")
 
-    return EmailRuleResponse(
-        id=rule.id,
-        name=rule.name,
-        description=rule.description,
-        match_prompt=rule.match_prompt,
-        action=rule.action.value,
-        action_value=rule.action_value,
-        priority=rule.priority,
-        is_active=rule.is_active,
-        stop_processing=rule.stop_processing,
-        hit_count=rule.hit_count,
-        last_hit=rule.last_hit,
-        false_positives=rule.false_positives,
-        created_at=rule.created_at,
-        updated_at=rule.updated_at,
-    )
+    return email_rule_to_response(rule)
 
 
 @router.delete("/email-rules/{rule_id}")
@@ -926,6 +1117,33 @@ async def delete_email_rule(rule_id: str, db: Database = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Failed to delete rule")
 
 
+def _bounded_batch_evaluations(
+    emails: List[EmailRecord],
+    evaluate: Callable[[List[EmailRecord]], Awaitable[List[Dict[str, Any]]]],
+) -> List[Awaitable[Tuple[List[EmailRecord], Optional[List[Dict[str, Any]]], Optional[Exception]]]]:
+    """
+    Split emails into rule_eval_batch_size chunks and wrap each batch
+    evaluation so at most rule_eval_concurrency LLM calls run at once.
+
+    Each awaitable resolves to (chunk, results, error) - errors are returned
+    rather than raised so callers using as_completed still know the emails.
+    """
+    semaphore = asyncio.Semaphore(settings.rule_eval_concurrency)
+    batch_size = settings.rule_eval_batch_size
+
+    async def evaluate_chunk(chunk: List[EmailRecord]):
+        async with semaphore:
+            try:
+                return chunk, await evaluate(chunk), None
+            except Exception as e:
+                return chunk, None, e
+
+    return [
+        evaluate_chunk(emails[i:i + batch_size])
+        for i in range(0, len(emails), batch_size)
+    ]
+
+
 @router.post("/email-rules/test")
 async def test_email_rule(
     request: TestRuleRequest,
@@ -946,7 +1164,7 @@ async def test_email_rule(
         )
 
         # Get recent emails
-        recent_emails = db.get_recent_emails(hours=168, limit=request.limit)
+        recent_emails = db.get_recent_emails(hours=168, limit=request.limit, columns=EMAIL_HEADER_COLUMNS)
 
         if not recent_emails:
             return {
@@ -959,18 +1177,27 @@ async def test_email_rule(
         # Initialize rules agent for testing
         rules_agent = RulesAgent(db)
 
+        # Skip emails that can't match, then evaluate the rest in concurrent
+        # batches; gather keeps results in email order
+        candidates = rules_agent.prefilter_emails(test_rule, recent_emails)
+        batches = await asyncio.gather(*_bounded_batch_evaluations(
+            candidates, lambda chunk: rules_agent.evaluate_rule_batch(test_rule, chunk)
+        ))
+
         matches = []
-        for email in recent_emails:
-            result = await rules_agent.evaluate_rule(email, test_rule)
-
-            if result["matches"] and result["confidence"] >= 50:
-                matches.append({
-                    "email_id": email.id,
-                    "subject": email.subject[:60],
-                    "sender": email.sender_email,
-                    "confidence": result["confidence"],
-                    "reason": result["reason"],
-                })
+        for chunk, results, error in batches:
+            if error:
+                raise error
+
+            for email, result in zip(chunk, results):
+                if result["matches"] and result["confidence"] >= 50:
+                    matches.append({
+                        "email_id": email.id,
+                        "subject": email.subject[:60],
+                        "sender": email.sender_email,
+                        "confidence": result["confidence"],
+                        "reason": result["reason"],
+                    })
 
         return {
             "match_prompt": request.match_prompt,
@@ -992,12 +1219,14 @@ async def report_false_positive(rule_id: str, db: Database = Depends(get_db)):
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
 
-    db.record_email_rule_false_positive(rule_id)
+    new_count = db.record_email_rule_false_positive(rule_id)
+    if new_count is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
 
     return {
         "success": True,
         "message": f"False positive recorded for rule '{rule.name}'",
-        "new_false_positive_count": rule.false_positives + 1,
+        "new_false_positive_count": new_count,
     }
 
 
@@ -1007,13 +1236,32 @@ class RunRuleRequest(BaseModel):
 
 
 from fastapi.responses import StreamingResponse
-import json
-import asyncio
+
+
+# Constant Server-Sent Events framing, shared by every streamed frame
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_PROGRESS_PREFIX = _SSE_PREFIX + b'{"type":"progress","current":'
+_SSE_ACTION_PREFIX = _SSE_PREFIX + b'{"type":"action","email_id":'
+_SSE_OBJECT_END = b"}" + _SSE_SUFFIX
+
+
+def _sse_event(payload: Dict[str, Any]) -> bytes:
+    """Encode a payload as a compact Server-Sent Events data frame."""
+    return _SSE_PREFIX + json.dumps(payload, separators=(",", ":")).encode() + _SSE_SUFFIX
+
+
+_SSE_EMPTY_RUN = _sse_event({'type': 'complete', 'total_evaluated': 0, 'matched': 0, 'processed': 0, 'matches': []})
+
+
+# Rule streams running at once across all clients
+_rule_stream_slots = asyncio.Semaphore(settings.max_concurrent_rule_streams)
 
 
 @router.get("/email-rules/{rule_id}/run-stream")
 async def run_email_rule_stream(
     rule_id: str,
+    request: Request,
     dry_run: bool = Query(True),
     limit: int = Query(50),
 ):
@@ -1031,61 +1279,111 @@ async def run_email_rule_stream(
         raise HTTPException(status_code=400, detail="Rule is not active")
 
     async def generate():
+        # Bound how many streams evaluate at once; extra streams wait here
+        async with _rule_stream_slots:
+            async for frame in run():
+                yield frame
+
+    async def run():
+        evaluations: List[asyncio.Future] = []
         try:
             # Get recent emails
-            recent_emails = db.get_recent_emails(hours=168, limit=limit)
+            recent_emails = db.get_recent_emails(hours=168, limit=limit, columns=EMAIL_HEADER_COLUMNS)
             total = len(recent_emails)
 
             # Send initial info
-            yield f"data: {json.dumps({'type': 'start', 'total': total, 'rule_name': rule.name})}\n\n"
+            yield _sse_event({'type': 'start', 'total': total, 'rule_name': rule.name})
 
             if not recent_emails:
-                yield f"data: {json.dumps({'type': 'complete', 'total_evaluated': 0, 'matched': 0, 'processed': 0, 'matches': []})}\n\n"
+                yield _SSE_EMPTY_RUN
                 return
 
             # Initialize rules agent
             rules_agent = RulesAgent(db)
 
-            matches = []
+            # Matches are encoded as they're found, so the complete frame only
+            # joins them rather than serializing the whole list at the end
+            matches_json: List[bytes] = []
             errors = []
             processed = 0
 
-            for i, email in enumerate(recent_emails):
+            # Progress and action frames have a fixed shape; prebuild the
+            # per-run constant parts so the loop only encodes the varying fields
+            progress_middle = b',"total":' + str(total).encode() + b',"subject":'
+            action_suffix = b',"action":' + json.dumps(rule.action.value).encode() + _SSE_OBJECT_END
+
+            # Skip emails that can't match (they count as evaluated), then
+            # evaluate the rest in concurrent batches, reporting progress as
+            # each batch completes
+            candidates = rules_agent.prefilter_emails(rule, recent_emails)
+            evaluations = [
+                asyncio.ensure_future(evaluation)
+                for evaluation in _bounded_batch_evaluations(
+                    candidates, lambda chunk: rules_agent.evaluate_email_batch(rule, chunk)
+                )
+            ]
+            evaluated = total - len(candidates)
+            for evaluation in asyncio.as_completed(evaluations):
+                chunk, results, error = await evaluation
+                evaluated += len(chunk)
+
+                # Stop evaluating and applying actions once nobody is listening
+                if await request.is_disconnected():
+                    logger.info(f"Client disconnected from rule stream {rule_id}, stopping")
+                    return
+
                 # Send progress update
-                yield f"data: {json.dumps({'type': 'progress', 'current': i + 1, 'total': total, 'subject': email.subject[:50]})}\n\n"
-
-                try:
-                    # Evaluate single email
-                    result = await rules_agent.evaluate_single_email(rule, email)
-
-                    if result.get('matches'):
-                        match_info = {
-                            'email_id': email.id,
-                            'subject': email.subject,
-                            'sender': email.sender_email,
-                            'confidence': result.get('confidence', 0),
-                            'reason': result.get('reason', ''),
-                        }
-                        matches.append(match_info)
-
-                        # Apply action if not dry run
-                        if not dry_run:
-                            try:
-                                await rules_agent._execute_rule_action(email, rule)
-                                processed += 1
-                                yield f"data: {json.dumps({'type': 'action', 'email_id': email.id, 'subject': email.subject[:50], 'action': rule.action.value})}\n\n"
-                            except Exception as e:
-                                errors.append({'email_id': email.id, 'error': str(e)})
-
-                except Exception as e:
-                    errors.append({'email_id': email.id, 'error': str(e)})
+                yield (
+                    _SSE_PROGRESS_PREFIX + str(evaluated).encode() + progress_middle
+                    + json.dumps(chunk[-1].subject[:50]).encode() + _SSE_OBJECT_END
+                )
+
+                if error:
+                    errors.extend({'email_id': email.id, 'error': str(error)} for email in chunk)
+                    continue
+
+                for email, result in zip(chunk, results):
+                    if not result.get('matches'):
+                        continue
+
+                    match_info = {
+                        'email_id': email.id,
+                        'subject': email.subject,
+                        'sender': email.sender_email,
+                        'confidence': result.get('confidence', 0),
+                        'reason': result.get('reason', ''),
+                    }
+                    matches_json.append(json.dumps(match_info, separators=(",", ":")).encode())
+
+                    # Apply action if not dry run
+                    if not dry_run:
+                        try:
+                            await rules_agent._execute_rule_action(email, rule)
+                            processed += 1
+                            yield (
+                                _SSE_ACTION_PREFIX + json.dumps(email.id).encode()
+                                + b',"subject":' + json.dumps(email.subject[:50]).encode()
+                                + action_suffix
+                            )
+                        except Exception as e:
+                            errors.append({'email_id': email.id, 'error': str(e)})
 
             # Send final results
-            yield f"data: {json.dumps({'type': 'complete', 'rule_id': rule_id, 'rule_name': rule.name, 'dry_run': dry_run, 'total_evaluated': total, 'matched': len(matches), 'processed': processed, 'errors': len(errors), 'matches': matches, 'error_details': errors})}\n\n"
+            summary = {'type': 'complete', 'rule_id': rule_id, 'rule_name': rule.name, 'dry_run': dry_run, 'total_evaluated': total, 'matched': len(matches_json), 'processed': processed, 'errors': len(errors)}
+            yield (
+                _SSE_PREFIX + json.dumps(summary, separators=(",", ":")).encode()[:-1]
+                + b',"matches":[' + b",".join(matches_json) + b'],"error_details":'
+                + json.dumps(errors, separators=(",", ":")).encode() + _SSE_OBJECT_END
+            )
 
         except Exception as e:
             logger.error(f"Error in rule stream: {e}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield _sse_event({'type': 'error', 'message': str(e)})
+        finally:
+            # Cancel batches still waiting on Claude (disconnect, error or
+            # generator closed early) instead of letting them run unobserved
+            for evaluation in evaluations:
+                evaluation.cancel()
 
     return StreamingResponse(
         generate(),
@@ -1120,7 +1418,7 @@ async def run_email_rule(
 
     try:
         # Get recent emails to evaluate
-        recent_emails = db.get_recent_emails(hours=168, limit=request.limit)
+        recent_emails = db.get_recent_emails(hours=168, limit=request.limit, columns=EMAIL_HEADER_COLUMNS)
 
         if not recent_emails:
             return {
@@ -1154,52 +1452,67 @@ async def run_email_rule(
 
 
 # Folder contents endpoint - view emails in a specific folder
+def _format_folder_email(email: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a raw MS365 message to the folder browser's email shape."""
+    get = email.get
+    sender = get("from", {}).get("emailAddress", {})
+    return {
+        "id": get("id"),
+        "subject": get("subject", "(No Subject)"),
+        "sender_email": sender.get("address", ""),
+        "sender_name": sender.get("name", ""),
+        "received_at": get("receivedDateTime"),
+        "body_preview": get("bodyPreview", "")[:200],
+        "has_attachments": get("hasAttachments", False),
+        "importance": get("importance", "normal"),
+        "is_read": get("isRead", False),
+    }
+
+
+async def _fetch_folder_emails(
+    email_client: EmailClient,
+    folder_name: str,
+    mailbox_email: str,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """Resolve a folder path and fetch its messages (404 if the folder doesn't exist)."""
+    # Resolve folder name to ID
+    folder_id = await asyncio.to_thread(email_client._resolve_folder_id, folder_name, mailbox_email)
+
+    if not folder_id:
+        raise HTTPException(status_code=404, detail=f"Folder '{folder_name}' not found")
+
+    # Fetch emails from the folder
+    try:
+        return await asyncio.to_thread(
+            email_client.mcp.list_mail_messages,
+            mailbox=mailbox_email,
+            folder=folder_id,
+            top=limit
+        )
+    except Exception:
+        # The cached folder ID may be stale (folder deleted or renamed)
+        email_client.forget_folder_id(folder_name, mailbox_email)
+        raise
+
+
 @router.get("/folder-emails/{folder_name:path}")
 async def get_folder_emails(
     folder_name: str,
     mailbox: Optional[str] = Query(None, description="Mailbox email (uses primary if not specified)"),
     limit: int = Query(50, ge=1, le=200, description="Maximum emails to fetch"),
+    email_client: EmailClient = Depends(get_email_client),
 ):
     """
     Get emails from a specific folder in the mailbox.
     Useful for viewing emails that rules have moved to folders like Clutter, Billing, etc.
     """
-    from ..integrations.mcp_client import MCPClient
-    from ..integrations.mcp_email import EmailClient
-
     try:
-        mcp = MCPClient()
-        email_client = EmailClient(mcp)
-        mailbox_email = mailbox or settings.mailbox_email
-
-        # Resolve folder name to ID
-        folder_id = email_client._resolve_folder_id(folder_name, mailbox_email)
-
-        if not folder_id:
-            raise HTTPException(status_code=404, detail=f"Folder '{folder_name}' not found")
-
-        # Fetch emails from the folder
-        emails = mcp.list_mail_messages(
-            mailbox=mailbox_email,
-            folder=folder_id,
-            top=limit
-        )
+        mailbox_email = mailbox or _DEFAULT_MAILBOX
+        emails = await _fetch_folder_emails(email_client, folder_name, mailbox_email, limit)
 
         # Format for response
-        formatted_emails = []
-        for email in emails:
-            sender = email.get("from", {}).get("emailAddress", {})
-            formatted_emails.append({
-                "id": email.get("id"),
-                "subject": email.get("subject", "(No Subject)"),
-                "sender_email": sender.get("address", ""),
-                "sender_name": sender.get("name", ""),
-                "received_at": email.get("receivedDateTime"),
-                "body_preview": email.get("bodyPreview", "")[:200],
-                "has_attachments": email.get("hasAttachments", False),
-                "importance": email.get("importance", "normal"),
-                "is_read": email.get("isRead", False),
-            })
+        formatted_emails = [_format_folder_email(email) for email in emails]
 
         return {
             "folder": folder_name,
@@ -1215,25 +1528,54 @@ async def get_folder_emails(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/folder-emails-stream/{folder_name:path}")
+async def stream_folder_emails(
+    folder_name: str,
+    mailbox: Optional[str] = Query(None, description="Mailbox email (uses primary if not specified)"),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum emails to fetch"),
+    email_client: EmailClient = Depends(get_email_client),
+):
+    """
+    Stream emails from a folder as newline-delimited JSON, one email per line.
+
+    Same emails as /folder-emails, but the body is written as each email is
+    encoded instead of being built up as one JSON document.
+    """
+    try:
+        emails = await _fetch_folder_emails(email_client, folder_name, mailbox or _DEFAULT_MAILBOX, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching emails from folder {folder_name}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def generate():
+        for email in emails:
+            yield json.dumps(_format_folder_email(email), separators=(",", ":")).encode() + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 class DeleteFolderEmailRequest(BaseModel):
     message_id: str
     mailbox: Optional[str] = None
 
 
 @router.post("/folder-emails/delete")
-async def delete_folder_email(request: DeleteFolderEmailRequest):
+async def delete_folder_email(
+    request: DeleteFolderEmailRequest,
+    email_client: EmailClient = Depends(get_email_client),
+):
     """
     Delete an email by its MS365 message ID (moves to Deleted Items).
     Used for deleting emails from the folder browser.
     """
-    from ..integrations.mcp_client import MCPClient
-
     try:
-        mcp = MCPClient()
-        mailbox_email = request.mailbox or settings.mailbox_email
+        mailbox_email = request.mailbox or _DEFAULT_MAILBOX
 
         # Delete the email (moves to Deleted Items)
-        mcp.delete_mail_message(
+        await asyncio.to_thread(
+            email_client.mcp.delete_mail_message,
             message_id=request.message_id,
             sender_email=mailbox_email
         )
@@ -1245,42 +1587,60 @@ async def delete_folder_email(request: DeleteFolderEmailRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Folder listings per (mailbox, recursive): (expires_at, response). Short TTL
+# since item counts change, but the folder tree walk is many Graph calls.
+FOLDERS_CACHE_TTL = 60.0
+_folders_cache: Dict[Tuple[str, bool], Tuple[float, Dict[str, Any]]] = {}
+
+
+def _folder_sort_key(folder: Dict[str, Any]) -> str:
+    """Sort key for folders: case-insensitive name."""
+    return folder["name"].lower()
+
+
+def _sort_folder_tree(folders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort every level of a folder tree alphabetically, in place."""
+    stack = [folders]
+    while stack:
+        level = stack.pop()
+        level.sort(key=_folder_sort_key)
+        stack.extend(folder["children"] for folder in level if folder.get("children"))
+    return folders
+
+
 # Email folders endpoint for folder browser
 @router.get("/email-folders")
 async def list_email_folders(
     mailbox: Optional[str] = Query(None, description="Mailbox email (uses primary if not specified)"),
     recursive: bool = Query(True, description="Fetch folders recursively including subfolders"),
+    email_client: EmailClient = Depends(get_email_client),
 ):
     """
     List available email folders for the mailbox, including nested subfolders.
     """
-    from ..integrations.mcp_client import MCPClient
+    mailbox_email = mailbox or _DEFAULT_MAILBOX
+    cached = _folders_cache.get((mailbox_email, recursive))
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
 
     try:
-        mcp = MCPClient()
-        mailbox_email = mailbox or settings.mailbox_email
+        mcp = email_client.mcp
 
         if recursive:
             # Fetch all folders recursively including subfolders
-            folders = mcp.list_all_mail_folders_recursive(mailbox=mailbox_email, max_depth=3)
-
-            def sort_folders(folder_list):
-                """Recursively sort folders alphabetically."""
-                folder_list.sort(key=lambda f: f["name"].lower())
-                for folder in folder_list:
-                    if folder.get("children"):
-                        sort_folders(folder["children"])
-                return folder_list
+            folders = await asyncio.to_thread(
+                mcp.list_all_mail_folders_recursive, mailbox=mailbox_email, max_depth=3
+            )
 
-            sort_folders(folders)
+            _sort_folder_tree(folders)
 
-            return {
+            result = {
                 "mailbox": mailbox_email,
                 "folders": folders,
             }
         else:
             # Fetch only top-level folders
-            raw_folders = mcp.list_mail_folders(mailbox=mailbox_email)
+            raw_folders = await asyncio.to_thread(mcp.list_mail_folders, mailbox=mailbox_email)
 
             # Format folders for the UI with child folder count
             formatted_folders = []
@@ -1294,13 +1654,18 @@ async def list_email_folders(
                 })
 
             # Sort alphabetically by name
-            formatted_folders.sort(key=lambda f: f["name"].lower())
+            formatted_folders.sort(key=_folder_sort_key)
 
-            return {
+            result = {
                 "mailbox": mailbox_email,
                 "folders": formatted_folders,
             }
 
+        # Recursive listing swallows fetch errors, so don't cache an empty tree
+        if result["folders"]:
+            _folders_cache[(mailbox_email, recursive)] = (time.monotonic() + FOLDERS_CACHE_TTL, result)
+        return result
+
     except Exception as e:
         logger.error(f"Error listing email folders: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to list folders: {str(e)}")
@@ -1314,17 +1679,14 @@ async def health_check(db: Database = Depends(get_db)):
     mcp_connected = True
     try:
         # Simple DB check
-        db.get_stats(hours=1)
+        await asyncio.to_thread(db.get_stats, hours=1)
     except Exception:
         mcp_connected = False
 
-    # Check if Teams is configured
-    teams_configured = bool(settings.teams_channel_id or settings.teams_chat_id)
-
     return {
         "status": "healthy",
         "service": "Email AI Manager Dashboard API",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "mcp_connected": mcp_connected,
-        "teams_configured": teams_configured,
+        "teams_configured": _TEAMS_CONFIGURED,
     }
@@ -16,7 +16,7 @@ class EmailSummary(BaseModel):
     sender_name: Optional[str] = None
     state: str
     category: Optional[str] = None
-    priority: int = 3
+    priority: Optional[int] = 3  # the column is nullable
     spam_score: int = 0
     received_at: datetime
     has_draft: bool = False
@@ -41,7 +41,7 @@ class EmailDetail(BaseModel):
     importance: str = "normal"
     state: str
     category: Optional[str] = None
-    priority: int = 3
+    priority: Optional[int] = 3
     spam_score: int = 0
     summary: Optional[str] = None
     current_draft: Optional[str] = None
@@ -57,10 +57,11 @@ class EmailDetail(BaseModel):
 class EmailListResponse(BaseModel):
     """Paginated list of emails."""
     emails: List[EmailSummary]
-    total: int
+    total: Optional[int] = None  # None when the client skipped counting
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 # Audit log schemas
@@ -217,7 +218,7 @@ class CreateEmailRuleRequest(BaseModel):
     """Request to create an email rule."""
     name: str = Field(..., description="Human-readable name for the rule")
     description: str = Field(default="", description="What this rule does")
-    match_prompt: str = Field(..., description="Natural language condition to match emails (e.g., 'Invoices from subscription services like iTunes, Netflix')")
+    match_prompt: str = Field(..., description="Natural language condition to match emails (e.g., 'Invoices from subscription services like iTunes, Netflix'). Double-quoted terms are required: only emails containing one of them are evaluated")
     action: str = Field(default="move_to_folder", description="Action: move_to_folder, archive, forward, set_priority, add_label, notify")
     action_value: str = Field(default="", description="Folder name, email address, priority value, etc.")
     priority: int = Field(default=50, ge=1, le=100, description="Rule priority (lower = evaluated first)")
@@ -2,10 +2,12 @@
 Configuration management using Pydantic settings.
 """
 
+import logging
 import os
-from typing import Optional, List
-from pydantic_settings import BaseSettings
-from pydantic import Field
+from functools import cached_property, lru_cache
+from typing import FrozenSet, Optional, List, Tuple
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import Field, field_validator
 
 
 class Settings(BaseSettings):
@@ -33,8 +35,8 @@ class Settings(BaseSettings):
         ...,
         description="Primary mailbox email to monitor"
     )
-    shared_mailbox_emails: List[str] = Field(
-        default_factory=list,
+    shared_mailbox_emails: Tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Additional shared mailboxes to monitor (Phase 4)"
     )
 
@@ -155,14 +157,18 @@ class Settings(BaseSettings):
     )
 
     # Logging
-    log_level: str = Field(
-        default="INFO",
-        description="Logging level"
+    log_level: int = Field(
+        default=logging.INFO,
+        description="Logging level (name or number)"
     )
     log_file: Optional[str] = Field(
         default=None,
         description="Log file path (stdout if not set)"
     )
+    debug: bool = Field(
+        default=False,
+        description="Raise on access to email fields a list query did not load"
+    )
 
     # Agent Settings
     agent_model: str = Field(
@@ -173,6 +179,18 @@ class Settings(BaseSettings):
         default=4096,
         description="Max tokens for agent responses"
     )
+    rule_eval_concurrency: int = Field(
+        default=8,
+        description="Max concurrent Claude calls when testing or running an email rule"
+    )
+    rule_eval_batch_size: int = Field(
+        default=10,
+        description="Emails classified per Claude call when testing or running an email rule"
+    )
+    max_concurrent_rule_streams: int = Field(
+        default=4,
+        description="Max email rule run-streams evaluating at once (others wait)"
+    )
 
     # Spam Detection Settings
     spam_batch_size: int = Field(
@@ -191,8 +209,8 @@ class Settings(BaseSettings):
         default=70,
         description="Spam score threshold to ask user (0-100)"
     )
-    spam_sender_domains: List[str] = Field(
-        default_factory=list,
+    spam_sender_domains: FrozenSet[str] = Field(
+        default_factory=frozenset,
         description="Sender domains to always treat as spam"
     )
     spam_subject_patterns: List[str] = Field(
@@ -212,8 +230,8 @@ class Settings(BaseSettings):
 
     # Alert senders - FYI emails from these senders/domains get immediate notification
     # (with deduplication), while other FYI emails wait for morning summary
-    alert_sender_domains: List[str] = Field(
-        default_factory=lambda: [
+    alert_sender_domains: FrozenSet[str] = Field(
+        default_factory=lambda: frozenset({
             "meraki.com",
             "uptimerobot.com",
             "pagerduty.com",
@@ -222,7 +240,7 @@ class Settings(BaseSettings):
             "pingdom.com",
             "statuspage.io",
             "betterstack.com",
-        ],
+        }),
         description="Sender domains that trigger immediate FYI notifications (monitoring/alerts)"
     )
     alert_subject_patterns: List[str] = Field(
@@ -243,18 +261,72 @@ class Settings(BaseSettings):
         description="Subject patterns that trigger immediate FYI notifications"
     )
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        extra = "ignore"
+    # Schema build is deferred to the first Settings() (see get_settings);
+    # defaults are literals, so they aren't re-validated
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+        frozen=True,
+        defer_build=True,
+        validate_default=False,
+    )
+
+    @field_validator("spam_sender_domains", "alert_sender_domains")
+    @classmethod
+    def lowercase_domains(cls, v: FrozenSet[str]) -> FrozenSet[str]:
+        """Store domains lowercased so matching doesn't re-lower them per email."""
+        return frozenset(domain.lower() for domain in v)
+
+    @field_validator("log_level", mode="before")
+    @classmethod
+    def parse_log_level(cls, v):
+        """Resolve a level name like "INFO" to its logging constant."""
+        if isinstance(v, str) and not v.isdigit():
+            return logging.getLevelName(v.upper())
+        return v
+
+    @field_validator("teams_daily_digest_time")
+    @classmethod
+    def validate_digest_time(cls, v: str) -> str:
+        """Reject anything that isn't a valid HH:MM time at load."""
+        hour, sep, minute = v.partition(":")
+        if not (sep and hour.isdigit() and minute.isdigit()
+                and int(hour) < 24 and int(minute) < 60):
+            raise ValueError(f"expected HH:MM, got {v!r}")
+        return v
 
-    @property
-    def all_mailboxes(self) -> List[str]:
+    @cached_property
+    def all_mailboxes(self) -> Tuple[str, ...]:
         """Return all mailboxes to monitor."""
-        mailboxes = [self.mailbox_email]
-        mailboxes.extend(self.shared_mailbox_emails)
-        return mailboxes
+        return (self.mailbox_email, *self.shared_mailbox_emails)
+
+
+_REQUIRED_FIELDS = tuple(
+    name for name, field in Settings.model_fields.items() if field.is_required()
+)
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load settings from the environment once, on first use."""
+    # Containers usually don't ship a .env (or mount /dev/null over it);
+    # only hand pydantic-settings a regular file to parse
+    env_file = ".env" if os.path.isfile(".env") else None
+    if env_file is None:
+        # Without a .env everything comes from the environment, so a
+        # missing required var can be reported before pydantic builds
+        # the schema
+        present = {key.lower() for key in os.environ}
+        missing = [name.upper() for name in _REQUIRED_FIELDS if name not in present]
+        if missing:
+            raise RuntimeError(f"Missing required environment variables: {', '.join(missing)}")
+    return Settings(_env_file=env_file)
 
 
-# Global settings instance
-settings = Settings()
+def __getattr__(name: str):
+    # `settings` resolves lazily, so importing this module (e.g. just for
+    # Settings or get_settings) doesn't read and validate the environment
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,47 +2,227 @@
 SQLite database operations.
 """
 
+import dataclasses
 import json
 import logging
 import sqlite3
+import threading
 import uuid
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
 
-from .models import AuditLogEntry, EmailRecord, EmailState, SpamRule, EmailRule, RuleAction
+from .models import AuditLogEntry, EmailCategory, EmailRecord, EmailState, SpamRule, EmailRule, RuleAction
 
 logger = logging.getLogger(__name__)
 
+# Stored in PRAGMA user_version once _apply_migrations has run
+SCHEMA_VERSION = 6
+
+# Row cap for estimated counts - past this the dashboard just shows "10000+"
+ESTIMATE_COUNT_CAP = 10000
+
+# States that still need attention from the user
+PENDING_STATES = (
+    EmailState.NEW,
+    EmailState.PROCESSING,
+    EmailState.ACTION_REQUIRED,
+    EmailState.AWAITING_APPROVAL,
+)
+
+# Columns needed to build an EmailSummary (plus keyset sort keys); list
+# endpoints select only these so body_full and friends are never read
+EMAIL_SUMMARY_COLUMNS = (
+    "id", "message_id", "mailbox", "sender_email", "sender_name", "subject",
+    "state", "category", "priority", "spam_score", "received_at", "current_draft",
+    "approval_token", "follow_up_at", "created_at", "updated_at",
+)
+
+# Columns needed to evaluate an email against a rule and apply rule actions;
+# rule test/run endpoints select only these so bodies are never read
+EMAIL_HEADER_COLUMNS = (
+    "id", "message_id", "mailbox", "sender_email", "sender_name", "subject",
+    "body_preview", "state", "category", "priority", "received_at",
+    "created_at", "updated_at",
+)
+
+# Keyset orderings for paginated email lists: name -> (sort key expressions, direction)
+EMAIL_ORDERINGS = {
+    "recent": (("received_at", "id"), "DESC"),
+    "priority": (("priority", "received_at", "id"), "ASC"),
+    "follow_up": (("follow_up_at", "id"), "ASC"),
+}
+
+# WHERE terms an ordering brings with it. Written as literals, not bound
+# parameters, so SQLite can match the partial index that serves the ordering
+EMAIL_ORDERING_FILTERS = {
+    "follow_up": "state = 'follow_up' AND follow_up_at IS NOT NULL",
+}
+
+# Every emails column EmailRecord maps, in field order: full-row reads
+# select these (not *, whose order follows the migrations) for from_row
+EMAIL_COLUMNS = tuple(f.name for f in dataclasses.fields(EmailRecord))
+_EMAIL_SELECT = ", ".join(EMAIL_COLUMNS)
+_EMAIL_FIELDS = frozenset(EMAIL_COLUMNS)
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """
+    Fetch the remaining rows as plain dicts.
+
+    Switches the cursor to tuple rows first, so each row becomes one dict
+    instead of a sqlite3.Row that is then copied into a dict.
+    """
+    cursor.row_factory = None
+    names = [d[0] for d in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+
+def _cutoff(hours: int) -> str:
+    """
+    UTC timestamp `hours` ago, to the second, in the stored isoformat() shape.
+
+    Comparing a column to this directly (`received_at > ?`) keeps the
+    predicate sargable, unlike wrapping the column in datetime().
+    """
+    return (datetime.utcnow() - timedelta(hours=hours)).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _keyset_seek(keys: Sequence[str], direction: str, after: Sequence[Any]) -> Tuple[str, List[Any]]:
+    """
+    Build the WHERE term for rows that sort after `after` in a keyset ordering.
+
+    A row value comparison is used when it can be. It is NULL (so matches
+    nothing) once a cursor value is NULL, so such cursors get the expanded
+    form instead; SQLite sorts NULLs first when ascending, so rows after a
+    NULL are the equal-NULL ones further on plus every non-NULL value.
+    Descending orderings must use NOT NULL keys.
+    """
+    if all(value is not None for value in after):
+        op = "<" if direction == "DESC" else ">"
+        return f"({', '.join(keys)}) {op} ({', '.join('?' for _ in keys)})", list(after)
+    if direction == "DESC":
+        raise ValueError("NULL cursor values need an ascending ordering")
+
+    branches, params = [], []
+    for i, (key, value) in enumerate(zip(keys, after)):
+        past = f"{key} IS NOT NULL" if value is None else f"{key} > ?"
+        branches.append(" AND ".join([f"{k} IS ?" for k in keys[:i]] + [past]))
+        params.extend(after[:i])
+        if value is not None:
+            params.append(value)
+    return f"({' OR '.join(branches)})", params
+
+
+@lru_cache(maxsize=None)
+def _insert_sql(table: str, columns: Tuple[str, ...], conflict: str = "", keep: Tuple[str, ...] = ()) -> str:
+    """
+    Build an INSERT (or UPSERT, if conflict is given) for a to_dict() column list.
+
+    Memoized so each save reuses the same SQL string, which also keeps it in
+    the connection's statement cache. Columns in keep are not overwritten on
+    conflict.
+    """
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    if conflict:
+        updates = ", ".join(f"{k}=excluded.{k}" for k in columns if k not in keep)
+        sql += f" ON CONFLICT({conflict}) DO UPDATE SET {updates}"
+    return sql
+
+
+class _ProjectedEmailRecord(EmailRecord):
+    """EmailRecord loaded from a column projection that raises on unloaded fields."""
+
+    _loaded_fields = _EMAIL_FIELDS
+
+    def __getattribute__(self, name):
+        if name in _EMAIL_FIELDS and name not in object.__getattribute__(self, "_loaded_fields"):
+            raise AttributeError(f"EmailRecord.{name} was not loaded by this query")
+        return object.__getattribute__(self, name)
+
 
 class Database:
     """SQLite database handler."""
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, strict_projections: bool = False):
         self.db_path = Path(db_path)
+        # Raise instead of silently returning defaults for fields a column
+        # projection skipped (enable in dev/test to catch list-query regressions)
+        self.strict_projections = strict_projections
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread, opened on first use and kept until close()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Muted patterns are read for every notification but rarely change
+        self._muted_patterns: Optional[FrozenSet[str]] = None
+        self._muted_generation = 0
+        self._muted_lock = threading.Lock()
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection for the calling thread."""
+        conn = sqlite3.connect(
+            str(self.db_path), timeout=30, check_same_thread=False, cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        # Per-connection settings; journal_mode=WAL persists in the file
+        # and is set once in _init_db
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        # Page reads come straight from the mapped file, no read() copy
+        conn.execute("PRAGMA mmap_size=268435456")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
     @contextmanager
     def _get_connection(self):
-        """Get a database connection with proper handling."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection, committing on success."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
         try:
             yield conn
             conn.commit()
         except Exception as e:
             conn.rollback()
             raise e
-        finally:
-            conn.close()
+
+    def close(self):
+        """Close every connection opened by this instance."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        if connections:
+            # Refresh planner statistics for tables whose queries changed;
+            # once per database is enough, and it must not block the closes
+            try:
+                connections[0].execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.warning(f"PRAGMA optimize failed on close: {e}")
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not close database connection: {e}")
+        self._local = threading.local()
 
     def _init_db(self):
         """Initialize database schema."""
         schema_path = Path(__file__).parent.parent / "migrations" / "001_initial.sql"
 
         with self._get_connection() as conn:
+            # WAL lets readers proceed while a write is in progress
+            conn.execute("PRAGMA journal_mode=WAL")
+
+            # Schema is already current - skip the catalog introspection
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                self._ensure_audit_log_count(conn)
+                return
+
             # Check if tables exist
             cursor = conn.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' AND name='emails'"
@@ -56,12 +236,19 @@ class Database:
                     # Inline schema if migration file not found
                     self._create_schema(conn)
                     logger.info("Database schema initialized inline")
-            else:
-                # Apply Phase 4 migrations to existing database
-                self._apply_migrations(conn)
+
+            # The base schemas predate the later columns/tables, so fresh
+            # databases go through the migrations too
+            self._apply_migrations(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
     def _apply_migrations(self, conn: sqlite3.Connection):
-        """Apply migrations for Phase 4 columns to existing database."""
+        """
+        Bring an existing database up to SCHEMA_VERSION.
+
+        Every step checks before it alters, so it is safe on any older schema.
+        Bump SCHEMA_VERSION when adding a step.
+        """
         # Check if is_vip column exists
         cursor = conn.execute("PRAGMA table_info(emails)")
         columns = [row[1] for row in cursor.fetchall()]
@@ -128,6 +315,16 @@ class Database:
             logger.info("Applying migration: adding follow_up_reminded_count column")
             conn.execute("ALTER TABLE emails ADD COLUMN follow_up_reminded_count INTEGER DEFAULT 0")
 
+        # Follow-up lists filter on state = 'follow_up' and page by (due date,
+        # id); a partial index holds just those rows, already in that order.
+        # It replaces the single-column idx_emails_follow_up, which left the
+        # id tiebreak to a sort
+        conn.execute("DROP INDEX IF EXISTS idx_emails_follow_up")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_emails_follow_up_queue "
+            "ON emails(state, follow_up_at, id) WHERE state = 'follow_up'"
+        )
+
         # Check if email_rules table exists
         cursor = conn.execute(
             "SELECT name FROM sqlite_master WHERE type='table' AND name='email_rules'"
@@ -153,6 +350,72 @@ class Database:
                 )
             """)
 
+        # Composite indexes for dashboard list queries (filter + newest first)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_emails_state_received ON emails(state, received_at DESC)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_emails_category_received ON emails(category, received_at DESC)"
+        )
+        # Generated sender domain for indexed domain lookups (table_xinfo,
+        # since table_info does not list generated columns)
+        cursor = conn.execute("PRAGMA table_xinfo(emails)")
+        if 'sender_domain' not in [row[1] for row in cursor.fetchall()]:
+            logger.info("Applying migration: adding sender_domain column")
+            conn.execute(
+                "ALTER TABLE emails ADD COLUMN sender_domain TEXT GENERATED ALWAYS AS "
+                "(lower(substr(sender_email, instr(sender_email, '@') + 1))) VIRTUAL"
+            )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_emails_sender_domain ON emails(sender_domain)"
+        )
+        # Audit log for one email, newest first (supersedes idx_audit_email_id)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_email_ts ON audit_log(email_id, timestamp DESC)"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_audit_email_id")
+        # Spam rule lookup by (type, pattern)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_spam_rules_type_pattern ON spam_rules(rule_type, pattern)"
+        )
+        # Auto-sent digest (handled_by + state, newest sent first) and
+        # per-sender stats over a received_at window
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_emails_handled_sent ON emails(handled_by, state, sent_at DESC)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_emails_sender_received ON emails(sender_email, received_at DESC)"
+        )
+        # audit_log is append-only, so a counter kept by an insert trigger
+        # stays exact; (re)seeded here in the same transaction as the trigger.
+        # It used to be an 'audit_log_count' row in settings
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS audit_log_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                row_count INTEGER NOT NULL
+            )
+        """)
+        conn.execute("DROP TRIGGER IF EXISTS audit_log_count")
+        conn.execute("DELETE FROM settings WHERE key = 'audit_log_count'")
+        conn.execute(
+            "INSERT OR REPLACE INTO audit_log_stats (id, row_count) "
+            "SELECT 1, COUNT(*) FROM audit_log"
+        )
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS audit_log_stats_insert AFTER INSERT ON audit_log
+            BEGIN
+                UPDATE audit_log_stats SET row_count = row_count + 1 WHERE id = 1;
+            END
+        """)
+
+    def _ensure_audit_log_count(self, conn: sqlite3.Connection):
+        """Recount audit_log if its counter row has gone missing."""
+        if conn.execute("SELECT 1 FROM audit_log_stats WHERE id = 1").fetchone() is None:
+            logger.warning("Audit log counter missing; recounting audit_log")
+            conn.execute(
+                "INSERT INTO audit_log_stats (id, row_count) SELECT 1, COUNT(*) FROM audit_log"
+            )
+
     def _create_schema(self, conn: sqlite3.Connection):
         """Create database schema inline."""
         conn.executescript("""
@@ -192,6 +455,7 @@ class Database:
                 handled_by TEXT DEFAULT 'pending',
                 error_message TEXT,
                 retry_count INTEGER DEFAULT 0,
+                sender_domain TEXT GENERATED ALWAYS AS (lower(substr(sender_email, instr(sender_email, '@') + 1))) VIRTUAL,
                 UNIQUE(message_id, mailbox)
             );
 
@@ -209,6 +473,12 @@ class Database:
                 FOREIGN KEY (email_id) REFERENCES emails(id)
             );
 
+            -- Row count of audit_log, kept by the audit_log_stats_insert trigger
+            CREATE TABLE IF NOT EXISTS audit_log_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                row_count INTEGER NOT NULL
+            );
+
             -- Spam rules table
             CREATE TABLE IF NOT EXISTS spam_rules (
                 id TEXT PRIMARY KEY,
@@ -244,7 +514,13 @@ class Database:
             CREATE INDEX IF NOT EXISTS idx_emails_mailbox ON emails(mailbox);
             CREATE INDEX IF NOT EXISTS idx_emails_received ON emails(received_at);
             CREATE INDEX IF NOT EXISTS idx_emails_approval_token ON emails(approval_token);
-            CREATE INDEX IF NOT EXISTS idx_audit_email_id ON audit_log(email_id);
+            CREATE INDEX IF NOT EXISTS idx_emails_state_received ON emails(state, received_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_emails_category_received ON emails(category, received_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_emails_sender_domain ON emails(sender_domain);
+            CREATE INDEX IF NOT EXISTS idx_emails_handled_sent ON emails(handled_by, state, sent_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_emails_sender_received ON emails(sender_email, received_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_spam_rules_type_pattern ON spam_rules(rule_type, pattern);
+            CREATE INDEX IF NOT EXISTS idx_audit_email_ts ON audit_log(email_id, timestamp DESC);
             CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);
         """)
 
@@ -253,14 +529,62 @@ class Database:
         """Save or update an email record."""
         with self._get_connection() as conn:
             data = email.to_dict()
-            placeholders = ", ".join(["?" for _ in data])
-            columns = ", ".join(data.keys())
-            updates = ", ".join([f"{k}=excluded.{k}" for k in data.keys()])
+            conn.execute(
+                _insert_sql("emails", tuple(data), "message_id, mailbox"),
+                tuple(data.values()),
+            )
+
+    def save_emails(self, emails: Sequence[EmailRecord]) -> None:
+        """Save or update several email records in one transaction."""
+        if not emails:
+            return
+        rows = [email.to_dict() for email in emails]
+        with self._get_connection() as conn:
+            conn.executemany(
+                _insert_sql("emails", tuple(rows[0]), "message_id, mailbox"),
+                [tuple(data.values()) for data in rows],
+            )
+
+    def set_state(
+        self,
+        email_id: str,
+        new_state: EmailState,
+        handled_by: Optional[str] = None,
+        category: Optional[EmailCategory] = None,
+        expected_states: Optional[Set[EmailState]] = None,
+        require_draft: bool = False,
+    ) -> Optional[EmailState]:
+        """
+        Change an email's state in a single UPDATE without rewriting the row.
 
-            conn.execute(f"""
-                INSERT INTO emails ({columns}) VALUES ({placeholders})
-                ON CONFLICT(message_id, mailbox) DO UPDATE SET {updates}
-            """, list(data.values()))
+        The optional preconditions (expected_states, require_draft) are checked
+        in the same statement, so they cannot go stale between read and write.
+        Pass transition_sources(...) as expected_states to enforce the state
+        machine; an empty set matches nothing.
+
+        Returns:
+            The new state, or None if no email matched (missing or precondition failed)
+        """
+        sets = ["state = ?", "updated_at = ?"]
+        params: List[Any] = [new_state.value, datetime.utcnow().isoformat()]
+        if handled_by is not None:
+            sets.append("handled_by = ?")
+            params.append(handled_by)
+        if category is not None:
+            sets.append("category = ?")
+            params.append(category.value)
+
+        sql = f"UPDATE emails SET {', '.join(sets)} WHERE id = ?"
+        params.append(email_id)
+        if expected_states is not None:
+            sql += f" AND state IN ({', '.join('?' for _ in expected_states)})"
+            params.extend(s.value for s in expected_states)
+        if require_draft:
+            sql += " AND current_draft IS NOT NULL AND current_draft != ''"
+
+        with self._get_connection() as conn:
+            row = conn.execute(f"{sql} RETURNING state", params).fetchone()
+            return EmailState(row["state"]) if row else None
 
     def delete_email(self, email_id: str) -> bool:
         """Delete an email record from the database."""
@@ -271,109 +595,333 @@ class Database:
             )
             return cursor.rowcount > 0
 
+    def delete_emails(self, email_ids: List[str]) -> int:
+        """Delete several email records in one statement."""
+        if not email_ids:
+            return 0
+        with self._get_connection() as conn:
+            # One JSON array parameter keeps the SQL text (and its cached
+            # statement) the same whatever the number of IDs
+            cursor = conn.execute(
+                "DELETE FROM emails WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(email_ids)),)
+            )
+            return cursor.rowcount
+
+    def find_emails_by_domain(
+        self,
+        domain: str,
+        exclude_id: Optional[str] = None,
+        exclude_states: Optional[Set[EmailState]] = None,
+        hours: int = 168,
+        limit: int = 500,
+    ) -> List[Tuple[str, str, str]]:
+        """Get (id, message_id, mailbox) of recent emails from a sender domain."""
+        sql = """
+            SELECT id, message_id, mailbox FROM emails
+            WHERE sender_domain = ?
+            AND received_at > ?
+        """
+        params: List[Any] = [domain.lower(), _cutoff(hours)]
+        if exclude_id:
+            sql += " AND id != ?"
+            params.append(exclude_id)
+        if exclude_states:
+            sql += f" AND state NOT IN ({', '.join('?' for _ in exclude_states)})"
+            params.extend(s.value for s in exclude_states)
+        sql += " ORDER BY received_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._get_connection() as conn:
+            cursor = conn.execute(sql, params)
+            return [(row["id"], row["message_id"], row["mailbox"]) for row in cursor.fetchall()]
+
+    def get_message_coords(self, email_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get just what is needed to act on an email in MS365.
+
+        Returns message_id, mailbox, sender_email and state without loading
+        (or decoding) the body and the rest of the record.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT message_id, mailbox, sender_email, state FROM emails WHERE id = ?",
+                (email_id,)
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
     def get_email(self, email_id: str) -> Optional[EmailRecord]:
         """Get an email by internal ID."""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "SELECT * FROM emails WHERE id = ?",
+                f"SELECT {_EMAIL_SELECT} FROM emails WHERE id = ?",
                 (email_id,)
             )
             row = cursor.fetchone()
             if row:
-                return EmailRecord.from_dict(dict(row))
+                return EmailRecord.from_row(row)
         return None
 
     def get_email_by_message_id(self, message_id: str, mailbox: str) -> Optional[EmailRecord]:
         """Get an email by MS365 message ID."""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "SELECT * FROM emails WHERE message_id = ? AND mailbox = ?",
+                f"SELECT {_EMAIL_SELECT} FROM emails WHERE message_id = ? AND mailbox = ?",
                 (message_id, mailbox)
             )
             row = cursor.fetchone()
             if row:
-                return EmailRecord.from_dict(dict(row))
+                return EmailRecord.from_row(row)
         return None
 
     def get_email_by_approval_token(self, token: str) -> Optional[EmailRecord]:
         """Get an email by approval token."""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "SELECT * FROM emails WHERE approval_token = ? AND state = ?",
+                f"SELECT {_EMAIL_SELECT} FROM emails WHERE approval_token = ? AND state = ?",
                 (token, EmailState.AWAITING_APPROVAL.value)
             )
             row = cursor.fetchone()
             if row:
-                return EmailRecord.from_dict(dict(row))
+                return EmailRecord.from_row(row)
         return None
 
-    def get_emails_by_state(self, state: EmailState, limit: int = 100) -> List[EmailRecord]:
-        """Get emails in a specific state."""
+    def get_emails_by_state(
+        self,
+        state: EmailState,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[EmailRecord]:
+        """
+        Get emails in a specific state.
+
+        Pass `columns` (e.g. EMAIL_SUMMARY_COLUMNS) to load only those fields.
+        """
+        select = ", ".join(columns) if columns else _EMAIL_SELECT
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "SELECT * FROM emails WHERE state = ? ORDER BY received_at DESC LIMIT ?",
+                f"SELECT {select} FROM emails WHERE state = ? ORDER BY received_at DESC LIMIT ?",
                 (state.value, limit)
             )
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            return self._rows_to_emails(cursor, columns)
+
+    def get_pending_emails(self, columns: Optional[Sequence[str]] = None) -> List[EmailRecord]:
+        """
+        Get all emails awaiting action.
 
-    def get_pending_emails(self) -> List[EmailRecord]:
-        """Get all emails awaiting action."""
-        pending_states = [
-            EmailState.NEW.value,
-            EmailState.PROCESSING.value,
-            EmailState.ACTION_REQUIRED.value,
-            EmailState.AWAITING_APPROVAL.value,
-        ]
+        Pass `columns` (e.g. EMAIL_SUMMARY_COLUMNS) to load only those fields.
+        """
+        pending_states = [s.value for s in PENDING_STATES]
+        select = ", ".join(columns) if columns else _EMAIL_SELECT
         with self._get_connection() as conn:
             placeholders = ", ".join(["?" for _ in pending_states])
             cursor = conn.execute(
-                f"SELECT * FROM emails WHERE state IN ({placeholders}) ORDER BY priority, received_at",
+                f"SELECT {select} FROM emails WHERE state IN ({placeholders}) ORDER BY priority, received_at",
                 pending_states
             )
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            return self._rows_to_emails(cursor, columns)
+
+    def get_recent_emails(
+        self,
+        hours: int = 24,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[EmailRecord]:
+        """
+        Get emails from the last N hours.
 
-    def get_recent_emails(self, hours: int = 24, limit: int = 100) -> List[EmailRecord]:
-        """Get emails from the last N hours."""
+        Pass `columns` (e.g. EMAIL_HEADER_COLUMNS) to load only those fields.
+        """
+        select = ", ".join(columns) if columns else _EMAIL_SELECT
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM emails
-                WHERE datetime(received_at) > datetime('now', ? || ' hours')
+            cursor = conn.execute(f"""
+                SELECT {select} FROM emails
+                WHERE received_at > ?
                 ORDER BY received_at DESC
                 LIMIT ?
-            """, (f"-{hours}", limit))
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            """, (_cutoff(hours), limit))
+            return self._rows_to_emails(cursor, columns)
+
+    def _rows_to_emails(
+        self,
+        cursor: sqlite3.Cursor,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[EmailRecord]:
+        """
+        Convert a cursor's rows to EmailRecords, strict about unloaded fields if enabled.
+
+        Without `columns` the query must have selected EMAIL_COLUMNS.
+        """
+        if not columns:
+            cursor.row_factory = None
+            return [EmailRecord.from_row(row) for row in cursor]
+        if not self.strict_projections:
+            return [EmailRecord.from_dict(row) for row in _fetch_dicts(cursor)]
+
+        loaded = frozenset(columns)
+        emails = []
+        for row in _fetch_dicts(cursor):
+            email = _ProjectedEmailRecord.from_dict(row)
+            email._loaded_fields = loaded
+            emails.append(email)
+        return emails
+
+    def _email_filter(
+        self,
+        states: Optional[Set[EmailState]] = None,
+        exclude_states: Optional[Set[EmailState]] = None,
+        category: Optional[EmailCategory] = None,
+        recent_hours: Optional[int] = None,
+    ) -> Tuple[str, List[Any]]:
+        """
+        Build the WHERE clause shared by query_emails and count_emails.
+
+        With recent_hours, `states` widens the window instead of narrowing it:
+        emails received in the last recent_hours OR in one of `states`.
+        """
+        clauses = []
+        params: List[Any] = []
+        if recent_hours is not None:
+            recent = "received_at > ?"
+            params.append(_cutoff(recent_hours))
+            if states:
+                clauses.append(f"({recent} OR state IN ({', '.join('?' for _ in states)}))")
+                params.extend(s.value for s in states)
+            else:
+                clauses.append(recent)
+        elif states:
+            clauses.append(f"state IN ({', '.join('?' for _ in states)})")
+            params.extend(s.value for s in states)
+        if exclude_states:
+            clauses.append(f"state NOT IN ({', '.join('?' for _ in exclude_states)})")
+            params.extend(s.value for s in exclude_states)
+        if category:
+            clauses.append("category = ?")
+            params.append(category.value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query_emails(
+        self,
+        states: Optional[Set[EmailState]] = None,
+        exclude_states: Optional[Set[EmailState]] = None,
+        category: Optional[EmailCategory] = None,
+        limit: int = 20,
+        offset: int = 0,
+        order: str = "recent",
+        after: Optional[Sequence[Any]] = None,
+        recent_hours: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[EmailRecord]:
+        """
+        Get one page of emails, filtered and ordered in SQL.
+
+        Pass `after` (a sort key from email_sort_key) instead of `offset` to
+        seek straight to the next page rather than walking skipped rows.
+        Pass `columns` (e.g. EMAIL_SUMMARY_COLUMNS) to load only those fields;
+        the rest keep their EmailRecord defaults. An order may narrow the rows
+        too (see EMAIL_ORDERING_FILTERS): "follow_up" lists only follow-up
+        emails that have a due date.
+        """
+        select = ", ".join(columns) if columns else _EMAIL_SELECT
+        keys, direction = EMAIL_ORDERINGS[order]
+        where, params = self._email_filter(states, exclude_states, category, recent_hours)
+        terms = [EMAIL_ORDERING_FILTERS[order]] if order in EMAIL_ORDERING_FILTERS else []
+        if after is not None:
+            seek, seek_params = _keyset_seek(keys, direction, after)
+            terms.append(seek)
+            params = params + seek_params
+        if terms:
+            extra = " AND ".join(terms)
+            where = f"{where} AND {extra}" if where else f"WHERE {extra}"
+        order_by = ", ".join(f"{k} {direction}" for k in keys)
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                f"SELECT {select} FROM emails {where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            )
+            return self._rows_to_emails(cursor, columns)
+
+    @staticmethod
+    def email_sort_key(email: EmailRecord, order: str = "recent") -> List[Any]:
+        """Get the keyset values of an email for the given query_emails ordering."""
+        if order == "priority":
+            return [email.priority, email.received_at.isoformat(), email.id]
+        if order == "follow_up":
+            follow_up = email.follow_up_at.isoformat() if email.follow_up_at else None
+            return [follow_up, email.id]
+        return [email.received_at.isoformat(), email.id]
+
+    def count_emails(
+        self,
+        states: Optional[Set[EmailState]] = None,
+        exclude_states: Optional[Set[EmailState]] = None,
+        category: Optional[EmailCategory] = None,
+        exact: bool = True,
+        recent_hours: Optional[int] = None,
+    ) -> int:
+        """Count emails matching the same filters as query_emails."""
+        where, params = self._email_filter(states, exclude_states, category, recent_hours)
+        if not exact:
+            return self.estimate_count("emails", where, params)
+        with self._get_connection() as conn:
+            cursor = conn.execute(f"SELECT COUNT(*) as count FROM emails {where}", params)
+            return cursor.fetchone()["count"]
+
+    def estimate_count(
+        self,
+        table: str,
+        where_sql: str = "",
+        params: Optional[List[Any]] = None,
+        cap: int = ESTIMATE_COUNT_CAP,
+    ) -> int:
+        """
+        Count rows up to a cap.
+
+        The scan stops after `cap` matching rows, so large tables return `cap`
+        instead of paying for a full COUNT(*). Only call with trusted table/WHERE SQL.
+        """
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                f"SELECT COUNT(*) as count FROM (SELECT 1 FROM {table} {where_sql} LIMIT ?)",
+                list(params or []) + [cap]
+            )
+            return cursor.fetchone()["count"]
 
     def get_pending_followups(self) -> List[EmailRecord]:
         """Get emails that need follow-up reminders (due or overdue)."""
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM emails
+            cursor = conn.execute(f"""
+                SELECT {_EMAIL_SELECT} FROM emails
                 WHERE state = 'follow_up'
                 AND follow_up_at IS NOT NULL
-                AND datetime(follow_up_at) <= datetime('now')
+                AND follow_up_at <= ?
                 ORDER BY follow_up_at ASC
-            """)
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
-
-    def get_all_followups(self) -> List[EmailRecord]:
-        """Get all emails marked for follow-up (for dashboard)."""
-        with self._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM emails
-                WHERE state = 'follow_up'
-                ORDER BY follow_up_at ASC NULLS LAST
-            """)
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            """, (_cutoff(0),))
+            return self._rows_to_emails(cursor)
 
     # Processed message tracking
     def is_message_processed(self, message_id: str, mailbox: str) -> bool:
         """Check if a message has already been processed."""
         with self._get_connection() as conn:
             cursor = conn.execute(
-                "SELECT 1 FROM processed_messages WHERE message_id = ? AND mailbox = ?",
+                "SELECT EXISTS(SELECT 1 FROM processed_messages WHERE message_id = ? AND mailbox = ?)",
                 (message_id, mailbox)
             )
-            return cursor.fetchone() is not None
+            return bool(cursor.fetchone()[0])
+
+    def get_processed_message_ids(self, message_ids: Sequence[str], mailbox: str) -> Set[str]:
+        """Return which of message_ids have already been processed for mailbox."""
+        if not message_ids:
+            return set()
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT message_id FROM processed_messages WHERE mailbox = ? "
+                "AND message_id IN (SELECT value FROM json_each(?))",
+                (mailbox, json.dumps(list(message_ids)))
+            )
+            return {row[0] for row in cursor}
 
     def mark_message_processed(self, message_id: str, mailbox: str) -> None:
         """Mark a message as processed."""
@@ -383,18 +931,49 @@ class Database:
                 (message_id, mailbox, datetime.utcnow().isoformat())
             )
 
+    def mark_messages_processed(self, messages: Sequence[Tuple[str, str]]) -> None:
+        """Mark several (message_id, mailbox) pairs as processed in one transaction."""
+        if not messages:
+            return
+        processed_at = datetime.utcnow().isoformat()
+        with self._get_connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO processed_messages (message_id, mailbox, processed_at) VALUES (?, ?, ?)",
+                [(message_id, mailbox, processed_at) for message_id, mailbox in messages]
+            )
+
     # Audit log operations
     def log_audit(self, entry: AuditLogEntry) -> None:
         """Add an audit log entry."""
         with self._get_connection() as conn:
             data = entry.to_dict()
-            placeholders = ", ".join(["?" for _ in data])
-            columns = ", ".join(data.keys())
-            conn.execute(
-                f"INSERT INTO audit_log ({columns}) VALUES ({placeholders})",
-                list(data.values())
+            conn.execute(_insert_sql("audit_log", tuple(data)), tuple(data.values()))
+
+    def log_audits(self, entries: Sequence[AuditLogEntry]) -> None:
+        """Add several audit log entries in one transaction."""
+        if not entries:
+            return
+        rows = [entry.to_dict() for entry in entries]
+        with self._get_connection() as conn:
+            conn.executemany(
+                _insert_sql("audit_log", tuple(rows[0])),
+                [tuple(data.values()) for data in rows],
             )
 
+    def _row_to_audit_entry(self, row: sqlite3.Row) -> AuditLogEntry:
+        """Convert an audit_log row to an AuditLogEntry."""
+        return AuditLogEntry(
+            id=row["id"],
+            email_id=row["email_id"],
+            timestamp=datetime.fromisoformat(row["timestamp"]),
+            agent=row["agent"],
+            action=row["action"],
+            details=json.loads(row["details"]) if row["details"] else {},
+            user_command=row["user_command"],
+            success=bool(row["success"]),
+            error=row["error"],
+        )
+
     def get_audit_log(
         self,
         email_id: Optional[str] = None,
@@ -413,25 +992,45 @@ class Database:
                     "SELECT * FROM audit_log ORDER BY timestamp DESC LIMIT ? OFFSET ?",
                     (limit, offset)
                 )
+            return [self._row_to_audit_entry(row) for row in cursor.fetchall()]
 
-            entries = []
-            for row in cursor.fetchall():
-                entry = AuditLogEntry(
-                    id=row["id"],
-                    email_id=row["email_id"],
-                    timestamp=datetime.fromisoformat(row["timestamp"]),
-                    agent=row["agent"],
-                    action=row["action"],
-                    details=json.loads(row["details"]) if row["details"] else {},
-                    user_command=row["user_command"],
-                    success=bool(row["success"]),
-                    error=row["error"],
-                )
-                entries.append(entry)
-            return entries
+    def get_audit_log_page(
+        self,
+        email_id: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> Tuple[List[AuditLogEntry], int]:
+        """
+        Get one page of audit log entries and the exact total in one query.
+
+        COUNT(*) OVER() computes the total alongside the page rows. A page past
+        the end has no rows to carry it, so that case falls back to a count.
+        """
+        if not email_id:
+            # The unfiltered total is a stored counter, so the page can use
+            # idx_audit_timestamp instead of a window over the whole table
+            return self.get_audit_log(limit=limit, offset=offset), self.get_audit_log_count()
+        where, params = "WHERE email_id = ?", [email_id]
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                f"""
+                SELECT *, COUNT(*) OVER() AS total_count FROM audit_log {where}
+                ORDER BY timestamp DESC LIMIT ? OFFSET ?
+                """,
+                params + [limit, offset]
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            total = self.get_audit_log_count(email_id) if offset else 0
+            return [], total
+        return [self._row_to_audit_entry(row) for row in rows], rows[0]["total_count"]
 
-    def get_audit_log_count(self, email_id: Optional[str] = None) -> int:
+    def get_audit_log_count(self, email_id: Optional[str] = None, exact: bool = True) -> int:
         """Get total count of audit log entries."""
+        if not exact:
+            if email_id:
+                return self.estimate_count("audit_log", "WHERE email_id = ?", [email_id])
+            return self.estimate_count("audit_log")
         with self._get_connection() as conn:
             if email_id:
                 cursor = conn.execute(
@@ -439,7 +1038,10 @@ class Database:
                     (email_id,)
                 )
             else:
-                cursor = conn.execute("SELECT COUNT(*) as count FROM audit_log")
+                # Maintained by the audit_log_stats_insert trigger
+                cursor = conn.execute(
+                    "SELECT row_count as count FROM audit_log_stats WHERE id = 1"
+                )
             return cursor.fetchone()["count"]
 
     # Spam rules operations
@@ -447,14 +1049,25 @@ class Database:
         """Save or update a spam rule."""
         with self._get_connection() as conn:
             data = rule.to_dict()
-            placeholders = ", ".join(["?" for _ in data])
-            columns = ", ".join(data.keys())
-            updates = ", ".join([f"{k}=excluded.{k}" for k in data.keys() if k != "id"])
+            conn.execute(
+                _insert_sql("spam_rules", tuple(data), "id", keep=("id",)),
+                tuple(data.values()),
+            )
 
-            conn.execute(f"""
-                INSERT INTO spam_rules ({columns}) VALUES ({placeholders})
-                ON CONFLICT(id) DO UPDATE SET {updates}
-            """, list(data.values()))
+    def _row_to_spam_rule(self, row: sqlite3.Row) -> SpamRule:
+        """Convert a spam_rules row to a SpamRule."""
+        return SpamRule(
+            id=row["id"],
+            rule_type=row["rule_type"],
+            pattern=row["pattern"],
+            action=row["action"],
+            confidence=row["confidence"],
+            hit_count=row["hit_count"],
+            false_positives=row["false_positives"],
+            created_at=datetime.fromisoformat(row["created_at"]),
+            last_hit=datetime.fromisoformat(row["last_hit"]) if row["last_hit"] else None,
+            is_active=bool(row["is_active"]),
+        )
 
     def get_active_spam_rules(self) -> List[SpamRule]:
         """Get all active spam rules."""
@@ -462,22 +1075,22 @@ class Database:
             cursor = conn.execute(
                 "SELECT * FROM spam_rules WHERE is_active = 1 ORDER BY confidence DESC"
             )
-            rules = []
-            for row in cursor.fetchall():
-                rule = SpamRule(
-                    id=row["id"],
-                    rule_type=row["rule_type"],
-                    pattern=row["pattern"],
-                    action=row["action"],
-                    confidence=row["confidence"],
-                    hit_count=row["hit_count"],
-                    false_positives=row["false_positives"],
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    last_hit=datetime.fromisoformat(row["last_hit"]) if row["last_hit"] else None,
-                    is_active=bool(row["is_active"]),
-                )
-                rules.append(rule)
-            return rules
+            return [self._row_to_spam_rule(row) for row in cursor.fetchall()]
+
+    def get_spam_rule_by_pattern(self, rule_type: str, pattern: str) -> Optional[SpamRule]:
+        """Get the active spam rule of a type for an exact pattern, if any."""
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT * FROM spam_rules
+                WHERE rule_type = ? AND pattern = ? AND is_active = 1
+                ORDER BY confidence DESC
+                LIMIT 1
+                """,
+                (rule_type, pattern)
+            )
+            row = cursor.fetchone()
+            return self._row_to_spam_rule(row) if row else None
 
     def increment_spam_rule_hit(self, rule_id: str) -> None:
         """Increment hit count for a spam rule."""
@@ -508,14 +1121,10 @@ class Database:
         """Save or update an email rule."""
         with self._get_connection() as conn:
             data = rule.to_dict()
-            placeholders = ", ".join(["?" for _ in data])
-            columns = ", ".join(data.keys())
-            updates = ", ".join([f"{k}=excluded.{k}" for k in data.keys() if k != "id"])
-
-            conn.execute(f"""
-                INSERT INTO email_rules ({columns}) VALUES ({placeholders})
-                ON CONFLICT(id) DO UPDATE SET {updates}
-            """, list(data.values()))
+            conn.execute(
+                _insert_sql("email_rules", tuple(data), "id", keep=("id",)),
+                tuple(data.values()),
+            )
 
     def get_email_rule(self, rule_id: str) -> Optional[EmailRule]:
         """Get a single email rule by ID."""
@@ -535,7 +1144,7 @@ class Database:
             cursor = conn.execute(
                 "SELECT * FROM email_rules WHERE is_active = 1 ORDER BY priority ASC"
             )
-            return [EmailRule.from_dict(dict(row)) for row in cursor.fetchall()]
+            return [EmailRule.from_dict(row) for row in _fetch_dicts(cursor)]
 
     def get_all_email_rules(self) -> List[EmailRule]:
         """Get all email rules (including inactive), ordered by priority."""
@@ -543,7 +1152,7 @@ class Database:
             cursor = conn.execute(
                 "SELECT * FROM email_rules ORDER BY priority ASC"
             )
-            return [EmailRule.from_dict(dict(row)) for row in cursor.fetchall()]
+            return [EmailRule.from_dict(row) for row in _fetch_dicts(cursor)]
 
     def delete_email_rule(self, rule_id: str) -> bool:
         """Delete an email rule."""
@@ -553,128 +1162,124 @@ class Database:
 
     def increment_email_rule_hit(self, rule_id: str) -> None:
         """Increment hit count for an email rule."""
+        now = datetime.utcnow().isoformat()
         with self._get_connection() as conn:
             conn.execute("""
                 UPDATE email_rules
                 SET hit_count = hit_count + 1, last_hit = ?, updated_at = ?
                 WHERE id = ?
-            """, (datetime.utcnow().isoformat(), datetime.utcnow().isoformat(), rule_id))
+            """, (now, now, rule_id))
 
-    def record_email_rule_false_positive(self, rule_id: str) -> None:
-        """Record a false positive for an email rule."""
+    def record_email_rule_false_positive(self, rule_id: str) -> Optional[int]:
+        """
+        Record a false positive for an email rule.
+
+        Returns the rule's false positive count after the increment, or None
+        if the rule doesn't exist.
+        """
         with self._get_connection() as conn:
-            conn.execute("""
+            row = conn.execute("""
                 UPDATE email_rules
                 SET false_positives = false_positives + 1, updated_at = ?
                 WHERE id = ?
-            """, (datetime.utcnow().isoformat(), rule_id))
+                RETURNING false_positives
+            """, (datetime.utcnow().isoformat(), rule_id)).fetchone()
+            return row[0] if row else None
 
     # Statistics
     def get_stats(self, hours: int = 24) -> Dict[str, Any]:
         """Get email processing statistics."""
+        cutoff = _cutoff(hours)
         with self._get_connection() as conn:
-            stats = {}
-
-            # Total emails in period (excluding deleted/ignored and spam)
-            cursor = conn.execute("""
-                SELECT COUNT(*) as total FROM emails
-                WHERE datetime(received_at) > datetime('now', ? || ' hours')
-                AND state NOT IN ('ignored', 'spam_detected')
-            """, (f"-{hours}",))
-            stats["total_emails"] = cursor.fetchone()["total"]
-
-            # Emails by state
+            # One pass over the period: per-state counts, with the spam
+            # candidates alongside; total and spam_filtered derive from it
             cursor = conn.execute("""
-                SELECT state, COUNT(*) as count FROM emails
-                WHERE datetime(received_at) > datetime('now', ? || ' hours')
+                SELECT state, COUNT(*) as count,
+                    COUNT(CASE WHEN category = 'spam_candidate' THEN 1 END) as spam_candidates
+                FROM emails
+                WHERE received_at > ?
                 GROUP BY state
-            """, (f"-{hours}",))
-            stats["by_state"] = {row["state"]: row["count"] for row in cursor.fetchall()}
-
-            # Emails sent
+            """, (cutoff,))
+            by_state = {}
+            total = spam_filtered = 0
+            for state, count, spam_candidates in cursor.fetchall():
+                by_state[state] = count
+                if state not in ("ignored", "spam_detected"):
+                    total += count
+                if state in ("spam_detected", "archived"):
+                    spam_filtered += spam_candidates
+
+            # Emails sent (sent_at window rather than received_at)
             cursor = conn.execute("""
                 SELECT COUNT(*) as sent FROM emails
                 WHERE state = 'sent'
-                AND datetime(sent_at) > datetime('now', ? || ' hours')
-            """, (f"-{hours}",))
-            stats["emails_sent"] = cursor.fetchone()["sent"]
-
-            # Spam filtered
-            cursor = conn.execute("""
-                SELECT COUNT(*) as spam FROM emails
-                WHERE state IN ('spam_detected', 'archived')
-                AND category = 'spam_candidate'
-                AND datetime(received_at) > datetime('now', ? || ' hours')
-            """, (f"-{hours}",))
-            stats["spam_filtered"] = cursor.fetchone()["spam"]
+                AND sent_at > ?
+            """, (cutoff,))
 
-            return stats
+            return {
+                "total_emails": total,
+                "by_state": by_state,
+                "emails_sent": cursor.fetchone()["sent"],
+                "spam_filtered": spam_filtered,
+            }
 
     def get_advanced_stats(self, hours: int = 24) -> Dict[str, Any]:
         """Get detailed analytics for the dashboard."""
+        cutoff = _cutoff(hours)
         with self._get_connection() as conn:
-            stats = {}
-
-            # Basic stats
-            basic = self.get_stats(hours)
-            stats.update(basic)
-
-            # Emails by category
-            cursor = conn.execute("""
-                SELECT category, COUNT(*) as count FROM emails
-                WHERE datetime(received_at) > datetime('now', ? || ' hours')
-                AND category IS NOT NULL
-                GROUP BY category
-            """, (f"-{hours}",))
-            stats["by_category"] = {row["category"]: row["count"] for row in cursor.fetchall()}
-
-            # Emails by mailbox
-            cursor = conn.execute("""
-                SELECT mailbox, COUNT(*) as count FROM emails
-                WHERE datetime(received_at) > datetime('now', ? || ' hours')
-                GROUP BY mailbox
-            """, (f"-{hours}",))
-            stats["by_mailbox"] = {row["mailbox"]: row["count"] for row in cursor.fetchall()}
-
-            # Auto-sent emails
-            cursor = conn.execute("""
-                SELECT COUNT(*) as auto_sent FROM emails
-                WHERE handled_by = 'ai_auto'
-                AND datetime(sent_at) > datetime('now', ? || ' hours')
-            """, (f"-{hours}",))
-            stats["auto_sent"] = cursor.fetchone()["auto_sent"]
-
-            # VIP emails
+            # One pass over the period, grouped by every dimension the
+            # breakdowns need; the per-dimension counts are summed below
             cursor = conn.execute("""
-                SELECT COUNT(*) as vip_count FROM emails
-                WHERE is_vip = 1
-                AND datetime(received_at) > datetime('now', ? || ' hours')
-            """, (f"-{hours}",))
-            stats["vip_emails"] = cursor.fetchone()["vip_count"]
-
-            # Average response time (for sent emails)
+                SELECT state, category, mailbox, priority, is_vip, COUNT(*) as count
+                FROM emails
+                WHERE received_at > ?
+                GROUP BY state, category, mailbox, priority, is_vip
+            """, (cutoff,))
+            total = spam_filtered = vip_emails = meeting_emails = 0
+            by_state: Dict[str, int] = {}
+            by_category: Dict[str, int] = {}
+            by_mailbox: Dict[str, int] = {}
+            by_priority: Dict[Any, int] = {}
+            for state, category, mailbox, priority, is_vip, count in cursor.fetchall():
+                if state not in ("ignored", "spam_detected"):
+                    total += count
+                if category == "spam_candidate" and state in ("spam_detected", "archived"):
+                    spam_filtered += count
+                if category == "meeting":
+                    meeting_emails += count
+                if is_vip == 1:
+                    vip_emails += count
+                by_state[state] = by_state.get(state, 0) + count
+                if category is not None:
+                    by_category[category] = by_category.get(category, 0) + count
+                by_mailbox[mailbox] = by_mailbox.get(mailbox, 0) + count
+                by_priority[priority] = by_priority.get(priority, 0) + count
+
+            # Sent in the period (sent_at window rather than received_at)
             cursor = conn.execute("""
-                SELECT AVG(
-                    (julianday(sent_at) - julianday(received_at)) * 24 * 60
-                ) as avg_response_minutes
+                SELECT
+                    COUNT(CASE WHEN state = 'sent' THEN 1 END) as sent,
+                    COUNT(CASE WHEN handled_by = 'ai_auto' THEN 1 END) as auto_sent,
+                    AVG(CASE WHEN state = 'sent'
+                        THEN (julianday(sent_at) - julianday(received_at)) * 24 * 60
+                    END) as avg_response_minutes
                 FROM emails
-                WHERE state = 'sent'
-                AND sent_at IS NOT NULL
-                AND datetime(sent_at) > datetime('now', ? || ' hours')
-            """, (f"-{hours}",))
-            result = cursor.fetchone()
-            stats["avg_response_minutes"] = round(result["avg_response_minutes"] or 0, 1)
+                WHERE sent_at > ?
+            """, (cutoff,))
+            sent = cursor.fetchone()
 
-            # Top senders
+            # Top senders. The unary + keeps the planner on the received_at
+            # range; grouping via idx_emails_sender_received would walk
+            # every sender's rows instead of just the window
             cursor = conn.execute("""
                 SELECT sender_email, sender_name, COUNT(*) as count
                 FROM emails
-                WHERE datetime(received_at) > datetime('now', ? || ' hours')
-                GROUP BY sender_email
+                WHERE received_at > ?
+                GROUP BY +sender_email
                 ORDER BY count DESC
                 LIMIT 10
-            """, (f"-{hours}",))
-            stats["top_senders"] = [
+            """, (cutoff,))
+            top_senders = [
                 {"email": row["sender_email"], "name": row["sender_name"], "count": row["count"]}
                 for row in cursor.fetchall()
             ]
@@ -683,34 +1288,35 @@ class Database:
             cursor = conn.execute("""
                 SELECT strftime('%H', received_at) as hour, COUNT(*) as count
                 FROM emails
-                WHERE datetime(received_at) > datetime('now', '-24 hours')
+                WHERE received_at > ?
                 GROUP BY hour
                 ORDER BY hour
-            """)
-            stats["hourly_distribution"] = {row["hour"]: row["count"] for row in cursor.fetchall()}
-
-            # Priority distribution
-            cursor = conn.execute("""
-                SELECT priority, COUNT(*) as count
-                FROM emails
-                WHERE datetime(received_at) > datetime('now', ? || ' hours')
-                GROUP BY priority
-                ORDER BY priority
-            """, (f"-{hours}",))
-            stats["by_priority"] = {str(row["priority"]): row["count"] for row in cursor.fetchall()}
-
-            # Meeting emails
-            cursor = conn.execute("""
-                SELECT COUNT(*) as meeting_count FROM emails
-                WHERE category = 'meeting'
-                AND datetime(received_at) > datetime('now', ? || ' hours')
-            """, (f"-{hours}",))
-            stats["meeting_emails"] = cursor.fetchone()["meeting_count"]
-
-            return stats
+            """, (_cutoff(24),))
+            hourly_distribution = {row["hour"]: row["count"] for row in cursor.fetchall()}
+
+        # NULLs sort first, as they did with ORDER BY
+        return {
+            "total_emails": total,
+            "by_state": dict(sorted(by_state.items())),
+            "emails_sent": sent["sent"],
+            "spam_filtered": spam_filtered,
+            "by_category": dict(sorted(by_category.items())),
+            "by_mailbox": dict(sorted(by_mailbox.items())),
+            "auto_sent": sent["auto_sent"],
+            "vip_emails": vip_emails,
+            "avg_response_minutes": round(sent["avg_response_minutes"] or 0, 1),
+            "top_senders": top_senders,
+            "hourly_distribution": hourly_distribution,
+            "by_priority": {
+                str(priority): by_priority[priority]
+                for priority in sorted(by_priority, key=lambda p: (p is not None, p))
+            },
+            "meeting_emails": meeting_emails,
+        }
 
     def get_sender_stats(self, sender_email: str, hours: int = 168) -> Dict[str, Any]:
         """Get stats for a specific sender."""
+        cutoff = _cutoff(hours)
         with self._get_connection() as conn:
             stats = {}
 
@@ -718,17 +1324,17 @@ class Database:
             cursor = conn.execute("""
                 SELECT COUNT(*) as total FROM emails
                 WHERE sender_email = ?
-                AND datetime(received_at) > datetime('now', ? || ' hours')
-            """, (sender_email, f"-{hours}"))
+                AND received_at > ?
+            """, (sender_email, cutoff))
             stats["total_emails"] = cursor.fetchone()["total"]
 
             # Categories
             cursor = conn.execute("""
                 SELECT category, COUNT(*) as count FROM emails
                 WHERE sender_email = ?
-                AND datetime(received_at) > datetime('now', ? || ' hours')
+                AND received_at > ?
                 GROUP BY category
-            """, (sender_email, f"-{hours}"))
+            """, (sender_email, cutoff))
             stats["by_category"] = {row["category"]: row["count"] for row in cursor.fetchall()}
 
             # Spam rate
@@ -736,8 +1342,8 @@ class Database:
                 SELECT COUNT(*) as spam FROM emails
                 WHERE sender_email = ?
                 AND category = 'spam_candidate'
-                AND datetime(received_at) > datetime('now', ? || ' hours')
-            """, (sender_email, f"-{hours}"))
+                AND received_at > ?
+            """, (sender_email, cutoff))
             spam_count = cursor.fetchone()["spam"]
             stats["spam_rate"] = round(spam_count / max(1, stats["total_emails"]) * 100, 1)
 
@@ -751,6 +1357,7 @@ class Database:
                 INSERT OR REPLACE INTO muted_senders (id, email_pattern, muted_at, reason)
                 VALUES (?, ?, ?, ?)
             """, (str(uuid.uuid4()), email_pattern.lower(), datetime.utcnow().isoformat(), reason))
+        self._invalidate_muted_patterns()
 
     def unmute_sender(self, email_pattern: str) -> bool:
         """Unmute a sender."""
@@ -759,32 +1366,39 @@ class Database:
                 "DELETE FROM muted_senders WHERE email_pattern = ?",
                 (email_pattern.lower(),)
             )
-            return cursor.rowcount > 0
+            removed = cursor.rowcount > 0
+        self._invalidate_muted_patterns()
+        return removed
+
+    def _invalidate_muted_patterns(self):
+        """Drop the cached muted patterns after a mute/unmute."""
+        with self._muted_lock:
+            self._muted_patterns = None
+            self._muted_generation += 1
+
+    def _get_muted_patterns(self) -> FrozenSet[str]:
+        """All muted patterns, loaded once and kept until the next mute/unmute."""
+        patterns = self._muted_patterns
+        if patterns is not None:
+            return patterns
+        with self._muted_lock:
+            generation = self._muted_generation
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT email_pattern FROM muted_senders")
+            patterns = frozenset(row[0] for row in cursor)
+        with self._muted_lock:
+            # Don't cache a set that a concurrent mute/unmute has already superseded
+            if generation == self._muted_generation:
+                self._muted_patterns = patterns
+        return patterns
 
     def is_sender_muted(self, sender_email: str) -> bool:
         """Check if a sender is muted (exact match or domain match)."""
         sender_lower = sender_email.lower()
         sender_domain = sender_lower.split('@')[-1] if '@' in sender_lower else ""
 
-        with self._get_connection() as conn:
-            # Check exact email match
-            cursor = conn.execute(
-                "SELECT 1 FROM muted_senders WHERE email_pattern = ?",
-                (sender_lower,)
-            )
-            if cursor.fetchone():
-                return True
-
-            # Check domain match
-            if sender_domain:
-                cursor = conn.execute(
-                    "SELECT 1 FROM muted_senders WHERE email_pattern = ?",
-                    (sender_domain,)
-                )
-                if cursor.fetchone():
-                    return True
-
-            return False
+        patterns = self._get_muted_patterns()
+        return sender_lower in patterns or (bool(sender_domain) and sender_domain in patterns)
 
     def get_muted_senders(self) -> List[Dict[str, Any]]:
         """Get all muted senders."""
@@ -792,20 +1406,12 @@ class Database:
             cursor = conn.execute(
                 "SELECT email_pattern as pattern, muted_at, reason FROM muted_senders ORDER BY muted_at DESC"
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
 
     # Settings operations (key-value store for app state)
     def get_setting(self, key: str) -> Optional[str]:
         """Get a setting value."""
         with self._get_connection() as conn:
-            # Ensure settings table exists
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    updated_at TEXT
-                )
-            """)
             cursor = conn.execute(
                 "SELECT value FROM settings WHERE key = ?",
                 (key,)
@@ -816,14 +1422,6 @@ class Database:
     def set_setting(self, key: str, value: str) -> None:
         """Set a setting value."""
         with self._get_connection() as conn:
-            # Ensure settings table exists
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    updated_at TEXT
-                )
-            """)
             conn.execute("""
                 INSERT OR REPLACE INTO settings (key, value, updated_at)
                 VALUES (?, ?, ?)
@@ -866,17 +1464,17 @@ class Database:
                 state_values = [s.value for s in states]
                 placeholders = ", ".join(["?" for _ in state_values])
                 cursor = conn.execute(
-                    f"""SELECT * FROM emails
+                    f"""SELECT {_EMAIL_SELECT} FROM emails
                     WHERE category = ? AND state IN ({placeholders})
                     ORDER BY received_at DESC LIMIT ?""",
                     [category.value] + state_values + [limit]
                 )
             else:
                 cursor = conn.execute(
-                    "SELECT * FROM emails WHERE category = ? ORDER BY received_at DESC LIMIT ?",
+                    f"SELECT {_EMAIL_SELECT} FROM emails WHERE category = ? ORDER BY received_at DESC LIMIT ?",
                     (category.value, limit)
                 )
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            return self._rows_to_emails(cursor)
 
     def get_fyi_emails_last_24h(self, limit: int = 50) -> List[EmailRecord]:
         """
@@ -884,15 +1482,15 @@ class Database:
         Excludes emails that have been archived, deleted, or ignored by the user.
         """
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM emails
+            cursor = conn.execute(f"""
+                SELECT {_EMAIL_SELECT} FROM emails
                 WHERE category IN ('fyi', 'newsletter')
                 AND state NOT IN ('archived', 'ignored', 'sent', 'error', 'spam_detected')
-                AND datetime(received_at) > datetime('now', '-24 hours')
+                AND received_at > ?
                 ORDER BY received_at DESC
                 LIMIT ?
-            """, (limit,))
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            """, (_cutoff(24), limit))
+            return self._rows_to_emails(cursor)
 
     def get_old_fyi_emails_to_archive(self, older_than_hours: int = 48, limit: int = 100) -> List[EmailRecord]:
         """
@@ -901,15 +1499,15 @@ class Database:
         Does not include emails that need action or were already archived.
         """
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM emails
+            cursor = conn.execute(f"""
+                SELECT {_EMAIL_SELECT} FROM emails
                 WHERE category IN ('fyi', 'newsletter')
                 AND state IN ('fyi_notified', 'acknowledged', 'new')
-                AND datetime(received_at) < datetime('now', ? || ' hours')
+                AND received_at < ?
                 ORDER BY received_at ASC
                 LIMIT ?
-            """, (f"-{older_than_hours}", limit))
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            """, (_cutoff(older_than_hours), limit))
+            return self._rows_to_emails(cursor)
 
     def archive_old_fyi_emails(self, older_than_hours: int = 48) -> int:
         """
@@ -919,22 +1517,22 @@ class Database:
         with self._get_connection() as conn:
             cursor = conn.execute("""
                 UPDATE emails
-                SET state = 'archived', updated_at = datetime('now')
+                SET state = 'archived', updated_at = ?
                 WHERE category IN ('fyi', 'newsletter')
                 AND state IN ('fyi_notified', 'acknowledged', 'new')
-                AND datetime(received_at) < datetime('now', ? || ' hours')
-            """, (f"-{older_than_hours}",))
+                AND received_at < ?
+            """, (datetime.utcnow().isoformat(), _cutoff(older_than_hours)))
             return cursor.rowcount
 
     def get_auto_sent_emails_last_24h(self, limit: int = 20) -> List[EmailRecord]:
         """Get emails that were auto-sent in the last 24 hours."""
         with self._get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT * FROM emails
+            cursor = conn.execute(f"""
+                SELECT {_EMAIL_SELECT} FROM emails
                 WHERE handled_by = 'ai_auto'
                 AND state = 'sent'
-                AND datetime(sent_at) > datetime('now', '-24 hours')
+                AND sent_at > ?
                 ORDER BY sent_at DESC
                 LIMIT ?
-            """, (limit,))
-            return [EmailRecord.from_dict(dict(row)) for row in cursor.fetchall()]
+            """, (_cutoff(24), limit))
+            return self._rows_to_emails(cursor)
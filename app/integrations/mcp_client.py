@@ -7,7 +7,9 @@ Microsoft 365 APIs (Email, Calendar, Teams).
 Uses JSON-RPC 2.0 over HTTP with Bearer token authentication.
 """
 
+import itertools
 import json
+from concurrent.futures import ThreadPoolExecutor
 import httpx
 import logging
 from typing import Any, Dict, Optional, List
@@ -41,7 +43,7 @@ class MCPClient:
     def __init__(self, base_url: Optional[str] = None, bearer_token: Optional[str] = None):
         self.base_url = base_url or settings.ms365_mcp_url
         self.bearer_token = bearer_token or getattr(settings, 'ms365_mcp_bearer_token', None)
-        self._request_id = 0
+        self._request_ids = itertools.count(1)
         self.client = httpx.Client(timeout=60.0)
 
     def _get_headers(self) -> Dict[str, str]:
@@ -55,9 +57,8 @@ class MCPClient:
         return headers
 
     def _next_request_id(self) -> int:
-        """Get next JSON-RPC request ID."""
-        self._request_id += 1
-        return self._request_id
+        """Get next JSON-RPC request ID (safe to call from worker threads)."""
+        return next(self._request_ids)
 
     def call_tool(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -307,22 +308,25 @@ class MCPClient:
     def list_all_mail_folders_recursive(
         self,
         mailbox: Optional[str] = None,
-        max_depth: int = 3
+        max_depth: int = 3,
+        max_concurrency: int = 8
     ) -> List[Dict[str, Any]]:
         """
         List all mail folders recursively, including nested subfolders.
 
+        The tree is walked a level at a time, fetching the children of every
+        folder on a level in parallel (folders without children are skipped),
+        so wall time grows with depth rather than with folder count.
+
         Args:
             mailbox: Email address of the mailbox
             max_depth: Maximum depth to recurse (default 3)
+            max_concurrency: Maximum child-folder requests in flight
 
         Returns:
             List of folders with nested 'children' property for subfolders
         """
-        def fetch_folders(parent_id: Optional[str], depth: int) -> List[Dict[str, Any]]:
-            if depth > max_depth:
-                return []
-
+        def fetch_folders(parent_id: Optional[str]) -> List[Dict[str, Any]]:
             try:
                 if parent_id:
                     folders = self.list_child_mail_folders(folder_id=parent_id, mailbox=mailbox)
@@ -332,9 +336,8 @@ class MCPClient:
                 logger.warning(f"Could not fetch folders (parent={parent_id}): {e}")
                 return []
 
-            result = []
-            for folder in folders:
-                folder_data = {
+            return [
+                {
                     "id": folder.get("id"),
                     "name": folder.get("displayName"),
                     "total_count": folder.get("totalItemCount", 0),
@@ -342,16 +345,29 @@ class MCPClient:
                     "child_folder_count": folder.get("childFolderCount", 0),
                     "children": []
                 }
+                for folder in folders
+            ]
 
-                # Recursively fetch children if this folder has any
-                if folder_data["child_folder_count"] > 0 and depth < max_depth:
-                    folder_data["children"] = fetch_folders(folder_data["id"], depth + 1)
+        if max_depth < 1:
+            return []
 
-                result.append(folder_data)
+        root = fetch_folders(None)
+        level = [folder for folder in root if folder["child_folder_count"] > 0]
+        depth = 1
 
-            return result
+        with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+            while level and depth < max_depth:
+                children_lists = pool.map(lambda folder: fetch_folders(folder["id"]), level)
+
+                next_level = []
+                for folder, children in zip(level, children_lists):
+                    folder["children"] = children
+                    next_level.extend(child for child in children if child["child_folder_count"] > 0)
+
+                level = next_level
+                depth += 1
 
-        return fetch_folders(None, 1)
+        return root
 
     # Teams operations
     def list_joined_teams(self) -> List[Dict[str, Any]]:
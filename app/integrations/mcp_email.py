@@ -4,9 +4,12 @@ Email-specific MCP operations.
 Higher-level wrapper around MCP client for email operations.
 """
 
+import asyncio
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from .mcp_client import MCPClient, MCPClientError
 from ..models import EmailRecord
@@ -14,6 +17,12 @@ from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# Folder IDs are stable, so resolved paths are cached across EmailClient
+# instances: (mailbox, lowercased folder path) -> (expires_at, folder_id)
+FOLDER_ID_CACHE_TTL = 3600.0
+_folder_id_cache: Dict[Tuple[Optional[str], str], Tuple[float, str]] = {}
+_folder_id_lock = threading.Lock()
+
 
 class EmailClient:
     """High-level email operations using MCP."""
@@ -271,6 +280,44 @@ class EmailClient:
             logger.error(f"Failed to delete email {message_id}: {e}")
             return False
 
+    async def delete_emails_batch(
+        self,
+        messages: List[Tuple[str, str]],
+        max_concurrency: int = 10
+    ) -> List[str]:
+        """
+        Move several emails to the deleted items folder concurrently.
+
+        The MCP server exposes no batch tool, so each move is still its own
+        call; they run in worker threads, at most max_concurrency at a time
+        to stay within Graph throttling limits.
+
+        Args:
+            messages: List of (message_id, mailbox) pairs
+            max_concurrency: Maximum number of deletes in flight
+
+        Returns:
+            Message IDs that were deleted successfully
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def delete_one(message_id: str, mailbox: str) -> bool:
+            async with semaphore:
+                return await asyncio.to_thread(self.delete_email, message_id, mailbox)
+
+        results = await asyncio.gather(
+            *(delete_one(message_id, mailbox) for message_id, mailbox in messages),
+            return_exceptions=True
+        )
+        deleted = []
+        for (message_id, _), result in zip(messages, results):
+            if result is True:
+                deleted.append(message_id)
+            elif isinstance(result, BaseException):
+                # delete_email only handles MCP errors; anything else lands here
+                logger.warning(f"Failed to delete email {message_id}: {result}", exc_info=result)
+        return deleted
+
     def move_to_folder(
         self,
         message_id: str,
@@ -307,8 +354,15 @@ class EmailClient:
             return True
         except MCPClientError as e:
             logger.error(f"Failed to move email {message_id} to {folder_name}: {e}")
+            # The folder may have been deleted or renamed since it was cached
+            self.forget_folder_id(folder_name, mailbox)
             return False
 
+    def forget_folder_id(self, folder_name: str, mailbox: Optional[str] = None):
+        """Drop a cached folder ID, e.g. after a call using it failed."""
+        with _folder_id_lock:
+            _folder_id_cache.pop((mailbox, folder_name.lower()), None)
+
     def _resolve_folder_id(
         self,
         folder_name: str,
@@ -317,6 +371,8 @@ class EmailClient:
         """
         Resolve a folder name (or path) to its MS365 folder ID.
 
+        Successful lookups are cached for FOLDER_ID_CACHE_TTL seconds.
+
         Args:
             folder_name: Folder name or path (e.g., "Billing" or "Inbox/Billing")
             mailbox: Mailbox email address
@@ -324,6 +380,24 @@ class EmailClient:
         Returns:
             Folder ID if found, None otherwise
         """
+        key = (mailbox, folder_name.lower())
+        with _folder_id_lock:
+            entry = _folder_id_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        folder_id = self._lookup_folder_id(folder_name, mailbox)
+        if folder_id:
+            with _folder_id_lock:
+                _folder_id_cache[key] = (time.monotonic() + FOLDER_ID_CACHE_TTL, folder_id)
+        return folder_id
+
+    def _lookup_folder_id(
+        self,
+        folder_name: str,
+        mailbox: Optional[str] = None
+    ) -> Optional[str]:
+        """Walk the folder tree to find a folder's ID (uncached)."""
         try:
             # Split the path into parts
             path_parts = folder_name.split("/")
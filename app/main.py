@@ -14,12 +14,12 @@ import threading
 from datetime import datetime
 
 from .config import settings
-from .db import Database
+from .db import Database, EMAIL_SUMMARY_COLUMNS
 from .agents import CoordinatorAgent
 
 # Configure logging
 logging.basicConfig(
-    level=getattr(logging, settings.log_level),
+    level=settings.log_level,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     handlers=[
         logging.StreamHandler(sys.stdout),
@@ -40,7 +40,7 @@ class EmailManager:
     """Main application class."""
 
     def __init__(self):
-        self.db = Database(settings.db_path)
+        self.db = Database(settings.db_path, strict_projections=settings.debug)
         self.coordinator = CoordinatorAgent(self.db)
         self.running = False
         self._shutdown_event = asyncio.Event()
@@ -89,7 +89,7 @@ class EmailManager:
 
     def _rehydrate(self):
         """Rehydrate pending items from database after restart."""
-        pending = self.db.get_pending_emails()
+        pending = self.db.get_pending_emails(columns=EMAIL_SUMMARY_COLUMNS)
         if pending:
             logger.info(f"Rehydrated {len(pending)} pending email(s) from previous session:")
             for email in pending[:5]:
@@ -178,6 +178,8 @@ def main():
     except KeyboardInterrupt:
         logger.info("Interrupted by user")
         manager.stop()
+    finally:
+        manager.db.close()
 
 
 if __name__ == "__main__":
@@ -3,9 +3,9 @@ Data models and state machine definitions.
 """
 
 from enum import Enum
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, FrozenSet, Sequence
 import uuid
 import secrets
 import json
@@ -75,6 +75,58 @@ class CommandType(Enum):
     UNKNOWN = "unknown"
 
 
+# Valid state transitions for EmailRecord.transition_to (ERROR is always allowed)
+VALID_TRANSITIONS: Dict[EmailState, FrozenSet[EmailState]] = {
+    EmailState.NEW: frozenset({EmailState.PROCESSING}),
+    EmailState.PROCESSING: frozenset({
+        EmailState.SPAM_DETECTED,
+        EmailState.FYI_NOTIFIED,
+        EmailState.ACTION_REQUIRED,
+        EmailState.ERROR
+    }),
+    EmailState.SPAM_DETECTED: frozenset({EmailState.ARCHIVED, EmailState.ACTION_REQUIRED}),
+    EmailState.FYI_NOTIFIED: frozenset({EmailState.ARCHIVED, EmailState.ACTION_REQUIRED}),
+    EmailState.ACTION_REQUIRED: frozenset({
+        EmailState.DRAFT_GENERATED,
+        EmailState.FORWARD_SUGGESTED,
+        EmailState.IGNORED
+    }),
+    EmailState.DRAFT_GENERATED: frozenset({EmailState.AWAITING_APPROVAL}),
+    EmailState.AWAITING_APPROVAL: frozenset({
+        EmailState.APPROVED,
+        EmailState.DRAFT_GENERATED,  # Re-edit
+        EmailState.IGNORED,
+        EmailState.SPAM_DETECTED,  # User marks as spam
+        EmailState.ARCHIVED  # User dismisses
+    }),
+    EmailState.APPROVED: frozenset({EmailState.SENT, EmailState.ERROR}),
+    EmailState.FORWARD_SUGGESTED: frozenset({EmailState.FORWARDED, EmailState.IGNORED}),
+}
+
+
+def _is_valid_transition(old_state: EmailState, new_state: EmailState) -> bool:
+    """Check a single step against VALID_TRANSITIONS."""
+    return new_state == EmailState.ERROR or new_state in VALID_TRANSITIONS.get(old_state, ())
+
+
+def transition_sources(*path: EmailState) -> FrozenSet[EmailState]:
+    """
+    States from which transition_to can take every step of `path` in order.
+
+    Lets a single UPDATE enforce the state machine with `state IN (...)`.
+    """
+    sources = set()
+    for start in EmailState:
+        state = start
+        for step in path:
+            if not _is_valid_transition(state, step):
+                break
+            state = step
+        else:
+            sources.add(start)
+    return frozenset(sources)
+
+
 @dataclass
 class EmailRecord:
     """Represents a tracked email."""
@@ -154,36 +206,7 @@ class EmailRecord:
 
     def transition_to(self, new_state: EmailState) -> None:
         """Transition to a new state with validation."""
-        # Define valid transitions
-        valid_transitions = {
-            EmailState.NEW: [EmailState.PROCESSING],
-            EmailState.PROCESSING: [
-                EmailState.SPAM_DETECTED,
-                EmailState.FYI_NOTIFIED,
-                EmailState.ACTION_REQUIRED,
-                EmailState.ERROR
-            ],
-            EmailState.SPAM_DETECTED: [EmailState.ARCHIVED, EmailState.ACTION_REQUIRED],
-            EmailState.FYI_NOTIFIED: [EmailState.ARCHIVED, EmailState.ACTION_REQUIRED],
-            EmailState.ACTION_REQUIRED: [
-                EmailState.DRAFT_GENERATED,
-                EmailState.FORWARD_SUGGESTED,
-                EmailState.IGNORED
-            ],
-            EmailState.DRAFT_GENERATED: [EmailState.AWAITING_APPROVAL],
-            EmailState.AWAITING_APPROVAL: [
-                EmailState.APPROVED,
-                EmailState.DRAFT_GENERATED,  # Re-edit
-                EmailState.IGNORED,
-                EmailState.SPAM_DETECTED,  # User marks as spam
-                EmailState.ARCHIVED  # User dismisses
-            ],
-            EmailState.APPROVED: [EmailState.SENT, EmailState.ERROR],
-            EmailState.FORWARD_SUGGESTED: [EmailState.FORWARDED, EmailState.IGNORED],
-        }
-
-        allowed = valid_transitions.get(self.state, [])
-        if new_state not in allowed and new_state != EmailState.ERROR:
+        if not _is_valid_transition(self.state, new_state):
             raise ValueError(
                 f"Invalid state transition: {self.state.value} -> {new_state.value}"
             )
@@ -276,6 +299,44 @@ class EmailRecord:
             retry_count=data.get("retry_count", 0),
         )
 
+    @classmethod
+    def from_row(cls, row: Sequence[Any]) -> "EmailRecord":
+        """
+        Create from a full row selected in dataclass field order.
+
+        Positional counterpart of from_dict for bulk reads: decodes a tuple
+        instead of building and looking up a dict per row.
+        """
+        return cls(*[
+            value if decode is None else decode(value)
+            for decode, value in zip(_EMAIL_ROW_DECODERS, row)
+        ])
+
+
+def _optional(decode):
+    """Wrap a column decoder so NULL/empty values map to None."""
+    return lambda value: decode(value) if value else None
+
+
+# Column decoders for EmailRecord.from_row, lined up with the dataclass
+# fields so the row order has a single source (fields not listed pass through)
+_EMAIL_COLUMN_DECODERS = {
+    "to_recipients": json.loads,
+    "cc_recipients": json.loads,
+    "received_at": datetime.fromisoformat,
+    "state": EmailState,
+    "category": _optional(EmailCategory),
+    "draft_versions": json.loads,
+    "draft_mode": DraftMode,
+    "created_at": datetime.fromisoformat,
+    "updated_at": datetime.fromisoformat,
+    "sent_at": _optional(datetime.fromisoformat),
+    "follow_up_at": _optional(datetime.fromisoformat),
+}
+_EMAIL_ROW_DECODERS = tuple(
+    _EMAIL_COLUMN_DECODERS.get(f.name) for f in fields(EmailRecord)
+)
+
 
 @dataclass
 class AuditLogEntry:
@@ -298,7 +359,7 @@ class AuditLogEntry:
             "timestamp": self.timestamp.isoformat(),
             "agent": self.agent,
             "action": self.action,
-            "details": json.dumps(self.details),
+            "details": json.dumps(self.details, separators=(",", ":")),
             "user_command": self.user_command,
             "success": self.success,
             "error": self.error,
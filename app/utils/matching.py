@@ -0,0 +1,53 @@
+"""
+Text matching helpers.
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+class SubstringMatcher:
+    """
+    Case-insensitive "does the text contain any of these patterns" check.
+
+    All patterns are compiled into a single regex alternation so a text is
+    scanned once, rather than once per pattern.
+    """
+
+    def __init__(self, patterns: Tuple[str, ...]):
+        # Map lowercased pattern -> pattern as configured, for reporting
+        self._originals = {}
+        for pattern in patterns:
+            self._originals.setdefault(pattern.lower(), pattern)
+
+        # Longest first so overlapping patterns report the most specific one
+        alternatives = sorted(self._originals, key=len, reverse=True)
+        self._regex = re.compile("|".join(map(re.escape, alternatives))) if alternatives else None
+
+    def search(self, text: str) -> Optional[str]:
+        """Return the first configured pattern found in text, or None."""
+        if self._regex is None:
+            return None
+
+        match = self._regex.search(text.lower())
+        return self._originals[match.group()] if match else None
+
+
+@lru_cache(maxsize=16)
+def substring_matcher(patterns: Tuple[str, ...]) -> SubstringMatcher:
+    """Get a compiled matcher for a set of patterns (cached per pattern tuple)."""
+    return SubstringMatcher(patterns)
+
+
+def domain_suffixes(address: str) -> Tuple[str, ...]:
+    """
+    Get the domain of an email address and each parent domain, most specific
+    first: "x@a.b.c" gives ("a.b.c", "b.c", "c").
+
+    Checking these against a set is a lookup per label, and a domain only
+    matches itself or its subdomains (not "notexample.com" for "example.com").
+    """
+    domain = address.rpartition("@")[2]
+    labels = domain.split(".")
+    return tuple(".".join(labels[i:]) for i in range(len(labels)) if labels[i])
@@ -6,6 +6,7 @@ const API_BASE = '/api';
 // State
 let currentTab = 'dashboard';
 let currentPage = 1;
+let pageCursors = [null];  // cursor that fetches each page (index currentPage - 1)
 let selectedEmails = new Set();
 let theme = localStorage.getItem('theme') || 'light';
 
@@ -150,8 +151,7 @@ function viewEmailsByState(state) {
     switchTab('emails');
     document.getElementById('state-filter').value = state;
     document.getElementById('category-filter').value = '';
-    currentPage = 1;
-    loadEmails();
+    filterEmails();
 }
 
 function toggleSidebar() {
@@ -206,7 +206,7 @@ async function loadDashboardStats() {
 async function loadDashboardPending() {
     const container = document.getElementById('dash-pending-list');
     try {
-        const response = await fetch(`${API_BASE}/emails/pending`);
+        const response = await fetch(`${API_BASE}/emails/pending?include_total=false`);
         const data = await response.json();
 
         if (data.emails.length === 0) {
@@ -282,6 +282,13 @@ async function loadDashboardSenders() {
 // Emails Tab
 // ============================================================
 
+function filterEmails() {
+    // Cursors belong to the old filter, so start again from the first page
+    currentPage = 1;
+    pageCursors = [null];
+    loadEmails();
+}
+
 async function loadEmails() {
     const listEl = document.getElementById('emails-list');
     listEl.innerHTML = '<p class="loading">Loading emails...</p>';
@@ -289,13 +296,16 @@ async function loadEmails() {
     try {
         const state = document.getElementById('state-filter').value;
         const category = document.getElementById('category-filter').value;
-        let url = `${API_BASE}/emails?page=${currentPage}&page_size=20`;
+        let url = `${API_BASE}/emails?page_size=20&include_total=false`;
+        const cursor = pageCursors[currentPage - 1];
+        if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
         if (state) url += `&state=${state}`;
         if (category) url += `&category=${category}`;
 
         const response = await fetch(url);
         const data = await response.json();
 
+        pageCursors[currentPage] = data.next_cursor;
         renderEmailList(listEl, data.emails, false);
         updatePagination(data);
     } catch (error) {
@@ -309,7 +319,7 @@ async function loadPendingEmails() {
     listEl.innerHTML = '<p class="loading">Loading pending emails...</p>';
 
     try {
-        const response = await fetch(`${API_BASE}/emails/pending`);
+        const response = await fetch(`${API_BASE}/emails/pending?include_total=false`);
         const data = await response.json();
 
         if (data.emails.length === 0) {
@@ -362,8 +372,8 @@ function renderEmailList(container, emails, showActions = false) {
 }
 
 function updatePagination(data) {
-    document.getElementById('page-info').textContent = `Page ${data.page}`;
-    document.getElementById('prev-page').disabled = data.page <= 1;
+    document.getElementById('page-info').textContent = `Page ${currentPage}`;
+    document.getElementById('prev-page').disabled = currentPage <= 1;
     document.getElementById('next-page').disabled = !data.has_more;
 }
 
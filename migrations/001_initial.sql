@@ -56,6 +56,9 @@ CREATE TABLE IF NOT EXISTS emails (
     is_auto_sent INTEGER DEFAULT 0,
     response_time_minutes INTEGER,
 
+    -- Sender domain for indexed domain lookups
+    sender_domain TEXT GENERATED ALWAYS AS (lower(substr(sender_email, instr(sender_email, '@') + 1))) VIRTUAL,
+
     -- Ensure unique message per mailbox
     UNIQUE(message_id, mailbox)
 );
@@ -74,6 +77,12 @@ CREATE TABLE IF NOT EXISTS audit_log (
     FOREIGN KEY (email_id) REFERENCES emails(id)
 );
 
+-- Row count of audit_log, kept by the audit_log_stats_insert trigger
+CREATE TABLE IF NOT EXISTS audit_log_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    row_count INTEGER NOT NULL
+);
+
 -- Spam rules table - learned spam patterns
 CREATE TABLE IF NOT EXISTS spam_rules (
     id TEXT PRIMARY KEY,
@@ -138,12 +147,18 @@ CREATE INDEX IF NOT EXISTS idx_emails_received ON emails(received_at);
 CREATE INDEX IF NOT EXISTS idx_emails_approval_token ON emails(approval_token);
 CREATE INDEX IF NOT EXISTS idx_emails_category ON emails(category);
 CREATE INDEX IF NOT EXISTS idx_emails_priority ON emails(priority);
+CREATE INDEX IF NOT EXISTS idx_emails_state_received ON emails(state, received_at DESC);
+CREATE INDEX IF NOT EXISTS idx_emails_category_received ON emails(category, received_at DESC);
+CREATE INDEX IF NOT EXISTS idx_emails_sender_domain ON emails(sender_domain);
+CREATE INDEX IF NOT EXISTS idx_emails_handled_sent ON emails(handled_by, state, sent_at DESC);
+CREATE INDEX IF NOT EXISTS idx_emails_sender_received ON emails(sender_email, received_at DESC);
 
-CREATE INDEX IF NOT EXISTS idx_audit_email_id ON audit_log(email_id);
+CREATE INDEX IF NOT EXISTS idx_audit_email_ts ON audit_log(email_id, timestamp DESC);
 CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp);
 CREATE INDEX IF NOT EXISTS idx_audit_agent ON audit_log(agent);
 
 CREATE INDEX IF NOT EXISTS idx_spam_rules_type ON spam_rules(rule_type);
 CREATE INDEX IF NOT EXISTS idx_spam_rules_active ON spam_rules(is_active);
+CREATE INDEX IF NOT EXISTS idx_spam_rules_type_pattern ON spam_rules(rule_type, pattern);
 
 CREATE INDEX IF NOT EXISTS idx_digest_date ON digest_entries(digest_date);
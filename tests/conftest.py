@@ -0,0 +1,31 @@
+"""
+Shared test fixtures.
+"""
+
+import os
+
+# Settings load lazily from the environment; give the required fields
+# placeholder values so agents can be constructed
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("MAILBOX_EMAIL", "me@example.com")
+
+import pytest
+
+from app.db import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh, fully migrated database."""
+    database = Database(str(tmp_path / "email_manager.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def client(db):
+    """API test client backed by the `db` fixture."""
+    from fastapi.testclient import TestClient
+    from app.api import create_app
+
+    return TestClient(create_app(db))
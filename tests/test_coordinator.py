@@ -0,0 +1,40 @@
+"""
+Tests for the coordinator's mailbox polling.
+"""
+
+import asyncio
+import logging
+
+from app.agents.coordinator import CoordinatorAgent
+from app.config import settings
+
+
+def message(message_id, subject):
+    return {
+        "id": message_id,
+        "subject": subject,
+        "from": {"emailAddress": {"address": "someone@example.com", "name": "Someone"}},
+        "receivedDateTime": "2026-03-01T09:00:00Z",
+        "bodyPreview": "Hello",
+    }
+
+
+def test_poll_ingests_each_message_once(db, monkeypatch, caplog):
+    coordinator = CoordinatorAgent(db)
+    messages = [message("a", "First"), message("b", "Second"), message("a", "First again")]
+    monkeypatch.setattr(
+        coordinator.email_client, "fetch_new_emails",
+        lambda mailbox: messages if mailbox == settings.mailbox_email else []
+    )
+    monkeypatch.setattr(coordinator.email_client, "get_email_details", lambda message_id, mailbox: None)
+
+    with caplog.at_level(logging.INFO, logger="app.agents.base"):
+        new_emails = asyncio.run(coordinator.poll_emails())
+
+    assert [email.message_id for email in new_emails] == ["a", "b"]
+    # Every returned email is the row that was stored
+    for email in new_emails:
+        assert db.get_email(email.id).message_id == email.message_id
+    assert db.get_processed_message_ids(["a", "b"], settings.mailbox_email) == {"a", "b"}
+    ingested = [r for r in caplog.records if "email_ingested" in r.getMessage()]
+    assert len(ingested) == 2
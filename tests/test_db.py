@@ -0,0 +1,162 @@
+"""
+Tests for Database queries and schema upkeep.
+"""
+
+import itertools
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db import Database, EMAIL_COLUMNS, _EMAIL_SELECT, _keyset_seek
+from app.models import AuditLogEntry, EmailCategory, EmailRecord, EmailState
+
+
+def make_email(message_id, sender_email="someone@example.com", hours_ago=1, **kwargs) -> EmailRecord:
+    return EmailRecord.create(
+        message_id=message_id, mailbox="me@example.com", sender_email=sender_email,
+        subject=f"Subject {message_id}", received_at=datetime.utcnow() - timedelta(hours=hours_ago),
+        **kwargs
+    )
+
+
+def test_from_row_matches_email_columns(db):
+    email = make_email(
+        "m1", sender_name="Someone", to_recipients=["me@example.com"], cc_recipients=["cc@example.com"],
+        category=EmailCategory.FYI, state=EmailState.FOLLOW_UP, priority=2, current_draft="Draft",
+        draft_versions=["v1"], follow_up_at=datetime(2026, 3, 1, 9, 30), is_vip=True,
+    )
+    db.save_email(email)
+    with db._get_connection() as conn:
+        table_columns = {row["name"] for row in conn.execute("PRAGMA table_info(emails)")}
+        row = conn.execute(f"SELECT {_EMAIL_SELECT} FROM emails WHERE id = ?", (email.id,)).fetchone()
+
+    assert set(EMAIL_COLUMNS) <= table_columns
+    assert tuple(row.keys()) == EMAIL_COLUMNS
+    loaded = EmailRecord.from_row(row)
+    assert loaded.to_dict() == email.to_dict()
+    assert db.get_email(email.id).to_dict() == email.to_dict()
+
+
+def test_set_state_sets_category(db):
+    email = make_email("m1", state=EmailState.ACTION_REQUIRED)
+    db.save_email(email)
+    assert db.set_state(email.id, EmailState.ARCHIVED, category=EmailCategory.FYI) == EmailState.ARCHIVED
+    updated = db.get_email(email.id)
+    assert (updated.state, updated.category) == (EmailState.ARCHIVED, EmailCategory.FYI)
+    assert updated.updated_at >= email.updated_at
+
+
+def test_query_emails_filters(db):
+    db.save_emails([
+        make_email("new-recent", state=EmailState.NEW, category=EmailCategory.FYI),
+        make_email("new-old", state=EmailState.NEW, hours_ago=500),
+        make_email("sent-recent", state=EmailState.SENT, category=EmailCategory.FYI),
+        make_email("sent-old", state=EmailState.SENT, hours_ago=500),
+        make_email("spam-recent", state=EmailState.SPAM_DETECTED),
+    ])
+
+    def ids(**filters):
+        return {e.message_id for e in db.query_emails(limit=100, **filters)}
+
+    assert ids(states={EmailState.NEW}) == {"new-recent", "new-old"}
+    assert ids(category=EmailCategory.FYI) == {"new-recent", "sent-recent"}
+    assert ids(exclude_states={EmailState.SPAM_DETECTED, EmailState.SENT}) == {"new-recent", "new-old"}
+    # recent_hours widens the window by `states` instead of narrowing it
+    assert ids(recent_hours=24) == {"new-recent", "sent-recent", "spam-recent"}
+    assert ids(recent_hours=24, states={EmailState.NEW}) == {
+        "new-recent", "new-old", "sent-recent", "spam-recent",
+    }
+    assert db.count_emails(recent_hours=24, states={EmailState.NEW}) == 4
+
+    recent = db.query_emails(limit=100)
+    assert [e.received_at for e in recent] == sorted((e.received_at for e in recent), reverse=True)
+    assert [e.message_id for e in db.query_emails(limit=2, offset=1)] == [e.message_id for e in recent[1:3]]
+
+
+def test_find_emails_by_domain(db):
+    original = make_email("original", sender_email="a@Spam.Test")
+    db.save_emails([
+        original,
+        make_email("newest", sender_email="b@spam.test", hours_ago=0.5),
+        make_email("older", sender_email="c@SPAM.test", hours_ago=2),
+        make_email("archived", sender_email="d@spam.test", state=EmailState.ARCHIVED),
+        make_email("too-old", sender_email="e@spam.test", hours_ago=500),
+        make_email("subdomain", sender_email="f@mail.spam.test"),
+        make_email("other", sender_email="g@example.com"),
+    ])
+
+    found = db.find_emails_by_domain(
+        "SPAM.test", exclude_id=original.id, exclude_states={EmailState.ARCHIVED}, hours=168
+    )
+    assert [message_id for _, message_id, _ in found] == ["newest", "older"]
+    assert all(mailbox == "me@example.com" for _, _, mailbox in found)
+    assert len(db.find_emails_by_domain("spam.test", limit=1)) == 1
+    assert len(db.find_emails_by_domain("spam.test")) == 4
+
+
+@pytest.mark.parametrize("direction, values", [
+    ("ASC", [None, 1, 2]),
+    ("DESC", [1, 2, 3]),
+])
+def test_keyset_seek_walks_every_row(direction, values):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (a INTEGER, b INTEGER, id TEXT)")
+    rows = [(a, b, f"{a}-{b}") for a, b in itertools.product(values, values)]
+    conn.executemany("INSERT INTO t VALUES (?, ?, ?)", rows)
+    order_by = ", ".join(f"{k} {direction}" for k in ("a", "b", "id"))
+    ordered = [tuple(r) for r in conn.execute(f"SELECT a, b, id FROM t ORDER BY {order_by}")]
+
+    for i, after in enumerate(ordered):
+        seek, params = _keyset_seek(("a", "b", "id"), direction, after)
+        rest = [tuple(r) for r in conn.execute(f"SELECT a, b, id FROM t WHERE {seek} ORDER BY {order_by}", params)]
+        assert rest == ordered[i + 1:], after
+
+
+def test_audit_log_count_follows_inserts(db):
+    assert db.get_audit_log_count() == 0
+    db.log_audit(AuditLogEntry(agent="test", action="one"))
+    db.log_audits([AuditLogEntry(agent="test", action="two"), AuditLogEntry(agent="test", action="three")])
+    assert db.get_audit_log_count() == 3
+    assert db.get_setting("audit_log_count") is None
+
+
+def test_audit_log_count_is_reseeded_on_open(db):
+    db.log_audits([AuditLogEntry(agent="test", action=str(i)) for i in range(4)])
+    with db._get_connection() as conn:
+        conn.execute("DELETE FROM audit_log_stats")
+    db.close()
+
+    reopened = Database(db.db_path)
+    try:
+        assert reopened.get_audit_log_count() == 4
+    finally:
+        reopened.close()
+
+
+def test_migration_moves_audit_log_count_out_of_settings(db):
+    db.log_audits([AuditLogEntry(agent="test", action=str(i)) for i in range(2)])
+    with db._get_connection() as conn:
+        # The pre-audit_log_stats layout: a settings row bumped by a trigger
+        conn.execute("DROP TRIGGER audit_log_stats_insert")
+        conn.execute("DROP TABLE audit_log_stats")
+        conn.execute(
+            "INSERT INTO settings (key, value, updated_at) VALUES ('audit_log_count', '7', '')"
+        )
+        conn.execute("""
+            CREATE TRIGGER audit_log_count AFTER INSERT ON audit_log
+            BEGIN
+                UPDATE settings SET value = value + 1 WHERE key = 'audit_log_count';
+            END
+        """)
+        conn.execute("PRAGMA user_version = 5")
+    db.close()
+
+    reopened = Database(db.db_path)
+    try:
+        assert reopened.get_audit_log_count() == 2
+        reopened.log_audit(AuditLogEntry(agent="test", action="after"))
+        assert reopened.get_audit_log_count() == 3
+        assert reopened.get_setting("audit_log_count") is None
+    finally:
+        reopened.close()
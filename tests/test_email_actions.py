@@ -0,0 +1,132 @@
+"""
+Tests for the email action endpoints.
+"""
+
+import pytest
+
+from app.models import EmailRecord, EmailState, transition_sources
+
+
+def save(db, state, **kwargs) -> EmailRecord:
+    email = EmailRecord.create(
+        message_id=f"m-{state.value}", mailbox="me@example.com",
+        sender_email="someone@example.com", subject="Hello", state=state, **kwargs
+    )
+    db.save_email(email)
+    return email
+
+
+def test_transition_sources_follow_the_state_machine():
+    assert transition_sources(EmailState.APPROVED) == {EmailState.AWAITING_APPROVAL}
+    assert transition_sources(EmailState.ARCHIVED) == {
+        EmailState.SPAM_DETECTED, EmailState.FYI_NOTIFIED, EmailState.AWAITING_APPROVAL,
+    }
+    # FYI_NOTIFIED -> ACKNOWLEDGED is not a valid step
+    assert transition_sources(EmailState.FYI_NOTIFIED, EmailState.ACKNOWLEDGED) == frozenset()
+
+
+def test_set_state_checks_expected_states(db):
+    email = save(db, EmailState.ACTION_REQUIRED)
+    assert db.set_state(email.id, EmailState.APPROVED, expected_states={EmailState.AWAITING_APPROVAL}) is None
+    assert db.set_state(email.id, EmailState.APPROVED, expected_states=set()) is None
+    assert db.get_email(email.id).state == EmailState.ACTION_REQUIRED
+
+    assert db.set_state(email.id, EmailState.IGNORED, handled_by="user") == EmailState.IGNORED
+    updated = db.get_email(email.id)
+    assert (updated.state, updated.handled_by) == (EmailState.IGNORED, "user")
+    assert db.set_state("missing", EmailState.IGNORED) is None
+
+
+def test_set_state_require_draft(db):
+    email = save(db, EmailState.AWAITING_APPROVAL)
+    assert db.set_state(email.id, EmailState.APPROVED, require_draft=True) is None
+    email.current_draft = "Thanks!"
+    db.save_email(email)
+    assert db.set_state(email.id, EmailState.APPROVED, require_draft=True) == EmailState.APPROVED
+
+
+@pytest.mark.parametrize("state", [
+    EmailState.ACTION_REQUIRED, EmailState.APPROVED, EmailState.SENT, EmailState.ARCHIVED,
+])
+def test_approve_rejects_other_states(db, client, state):
+    email = save(db, state, current_draft="Draft")
+    response = client.post(f"/api/emails/{email.id}/approve")
+    assert response.status_code == 400
+    assert db.get_email(email.id).state == state
+
+
+def test_approve_requires_draft(db, client):
+    email = save(db, EmailState.AWAITING_APPROVAL)
+    response = client.post(f"/api/emails/{email.id}/approve")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No draft to send"
+
+
+def test_approve_awaiting_approval(db, client):
+    email = save(db, EmailState.AWAITING_APPROVAL, current_draft="Draft")
+    response = client.post(f"/api/emails/{email.id}/approve")
+    assert response.status_code == 200
+    assert db.get_email(email.id).state == EmailState.APPROVED
+
+
+@pytest.mark.parametrize("state", [EmailState.FYI_NOTIFIED, EmailState.ACTION_REQUIRED, EmailState.NEW])
+def test_mark_fyi_rejects_invalid_transition(db, client, state):
+    email = save(db, state)
+    response = client.post(f"/api/emails/{email.id}/fyi")
+    assert response.status_code == 400
+    assert db.get_email(email.id).state == state
+
+
+def test_actions_on_missing_email(client):
+    for action in ("approve", "fyi", "ignore"):
+        assert client.post(f"/api/emails/missing/{action}").status_code == 404
+
+
+def test_dismiss_overrides_any_state(db, client):
+    email = save(db, EmailState.ACTION_REQUIRED)
+    response = client.post(f"/api/emails/{email.id}/ignore")
+    assert response.status_code == 200
+    assert db.get_email(email.id).state == EmailState.ARCHIVED
+
+
+class FakeEmailClient:
+    """Stands in for EmailClient; deletes fail for message IDs in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.deleted = []
+
+    def delete_email(self, message_id, mailbox=None):
+        if message_id in self.failing:
+            return False
+        self.deleted.append(message_id)
+        return True
+
+    async def delete_emails_batch(self, messages, max_concurrency=10):
+        return [message_id for message_id, mailbox in messages if self.delete_email(message_id, mailbox)]
+
+
+def save_spam(db, message_id, sender_email="offers@spam.test"):
+    email = EmailRecord.create(
+        message_id=message_id, mailbox="me@example.com",
+        sender_email=sender_email, subject="Offer", state=EmailState.ACTION_REQUIRED,
+    )
+    db.save_email(email)
+    return email
+
+
+@pytest.mark.parametrize("failing, original_kept, kept", [
+    ((), False, {"m-failing"}),
+    (("m-original",), True, {"m-failing"}),
+])
+def test_mark_spam_keeps_rows_whose_delete_failed(db, client, failing, original_kept, kept):
+    original = save_spam(db, "m-original")
+    similar = [save_spam(db, "m-similar"), save_spam(db, "m-failing")]
+    client.app.state.email_client = FakeEmailClient(failing={"m-failing", *failing})
+
+    response = client.post(f"/api/emails/{original.id}/spam")
+    assert response.status_code == 200
+    assert response.json()["success"] is not original_kept
+    assert (db.get_email(original.id) is not None) is original_kept
+    assert {e.message_id for e in similar if db.get_email(e.id) is not None} == kept
+    assert db.get_spam_rule_by_pattern("domain", "spam.test") is not None
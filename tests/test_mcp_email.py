@@ -0,0 +1,27 @@
+"""
+Tests for the MS365 email client.
+"""
+
+import asyncio
+import logging
+
+from app.integrations.mcp_email import EmailClient
+
+
+def test_delete_emails_batch_logs_unexpected_errors(monkeypatch, caplog):
+    client = EmailClient()
+
+    def delete_email(message_id, mailbox=None):
+        if message_id == "broken":
+            raise ValueError("unexpected response")
+        return message_id != "refused"
+
+    monkeypatch.setattr(client, "delete_email", delete_email)
+    messages = [("ok", "me@example.com"), ("broken", "me@example.com"), ("refused", "me@example.com")]
+    with caplog.at_level(logging.WARNING, logger="app.integrations.mcp_email"):
+        deleted = asyncio.run(client.delete_emails_batch(messages))
+
+    assert deleted == ["ok"]
+    [record] = caplog.records
+    assert "broken" in record.getMessage()
+    assert isinstance(record.exc_info[1], ValueError)
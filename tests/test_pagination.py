@@ -0,0 +1,111 @@
+"""
+Tests for cursor pagination of the email list endpoints.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta
+from functools import partial
+
+import pytest
+
+from app.api import routes
+from app.models import EmailRecord, EmailState
+
+
+def save_emails(db, count, **kwargs):
+    start = datetime.utcnow() - timedelta(hours=1)
+    emails = [
+        EmailRecord.create(
+            message_id=f"m-{i}", mailbox="me@example.com", sender_email="someone@example.com",
+            subject=f"Email {i}", received_at=start + timedelta(minutes=i), **kwargs
+        )
+        for i in range(count)
+    ]
+    db.save_emails(emails)
+    return emails
+
+
+def test_capped_estimate_is_made_exact_for_cursor_pages(db, client, monkeypatch):
+    save_emails(db, 5, state=EmailState.ARCHIVED)
+    monkeypatch.setattr(routes, "ESTIMATE_COUNT_CAP", 3)
+    monkeypatch.setattr(db, "estimate_count", partial(db.estimate_count, cap=3))
+
+    first = client.get("/api/emails?state=archived&page_size=2&exact_count=false").json()
+    assert first["total"] == 3
+
+    second = client.get(
+        f"/api/emails?state=archived&page_size=2&exact_count=false&cursor={first['next_cursor']}"
+    ).json()
+    assert second["total"] == 5
+
+
+def walk(client, url, page_size=2):
+    """Follow next_cursor from the first page to the last; return the ids seen."""
+    ids, cursor = [], None
+    while True:
+        page_url = f"{url}&page_size={page_size}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(page_url)
+        assert response.status_code == 200, response.json()
+        data = response.json()
+        ids += [email["id"] for email in data["emails"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_recent_cursor_round_trip(db, client):
+    emails = save_emails(db, 7, state=EmailState.ARCHIVED)
+    # Same received_at: the id tiebreak has to carry the seek
+    emails[3].received_at = emails[4].received_at
+    db.save_email(emails[3])
+
+    expected = [e["id"] for e in client.get("/api/emails?state=archived&page_size=100").json()["emails"]]
+    assert sorted(expected) == sorted(e.id for e in emails)
+    assert walk(client, "/api/emails?state=archived") == expected
+
+
+def test_priority_cursor_round_trip_with_null_priority(db, client):
+    emails = save_emails(db, 7, state=EmailState.ACTION_REQUIRED)
+    for email, priority in zip(emails, [2, 1, 2, 5, 1, 3, 3]):
+        email.priority = priority
+    db.save_emails(emails)
+    with db._get_connection() as conn:
+        # Rows written before priority was always set
+        conn.execute("UPDATE emails SET priority = NULL WHERE id IN (?, ?, ?)", (emails[0].id, emails[2].id, emails[5].id))
+
+    expected = [e["id"] for e in client.get("/api/emails/pending?page_size=100").json()["emails"]]
+    assert sorted(expected) == sorted(e.id for e in emails)
+    for page_size in (1, 2, 3):
+        assert walk(client, "/api/emails/pending?", page_size) == expected
+
+
+def test_follow_up_cursor_round_trip(db, client):
+    emails = save_emails(db, 5, state=EmailState.FOLLOW_UP)
+    due = datetime.utcnow() + timedelta(days=1)
+    for i, email in enumerate(emails):
+        email.follow_up_at = due + timedelta(hours=i % 2)
+    db.save_emails(emails)
+
+    ids = walk(client, "/api/emails/followups?")
+    assert [e.id for e in sorted(emails, key=lambda e: (e.follow_up_at, e.id))] == ids
+
+
+def encode(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    encode({"received_at": "2026-01-01"}),
+    encode(["2026-01-01"]),
+    encode(["2026-01-01", ["nested"]]),
+    encode([None, "x"]),
+])
+def test_malformed_cursor_is_rejected(client, cursor):
+    assert client.get(f"/api/emails?cursor={cursor}").status_code == 400
+
+
+def test_cursor_accepts_null_values(client):
+    response = client.get(f"/api/emails/pending?cursor={encode([None, '2026-01-01T00:00:00', 'x'])}")
+    assert response.status_code == 200
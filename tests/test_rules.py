@@ -0,0 +1,105 @@
+"""
+Tests for the rules agent prefilter and evaluation cache.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.agents.rules import RulesAgent, prefilter_terms
+from app.models import EmailRecord, EmailRule
+
+
+def make_email(**kwargs) -> EmailRecord:
+    kwargs.setdefault("sender_email", "someone@example.com")
+    return EmailRecord.create(message_id=kwargs.pop("message_id", "m1"), mailbox="me@example.com", **kwargs)
+
+
+@pytest.fixture
+def agent(db):
+    return RulesAgent(db)
+
+
+def test_prefilter_terms_are_quoted_literals():
+    assert prefilter_terms('Receipts from "iTunes" or “Netflix”') == ("itunes", "netflix")
+    assert prefilter_terms("Invoices from subscription services like iTunes") == ()
+    assert prefilter_terms('Empty "" quotes') == ()
+
+
+def test_unquoted_rule_keeps_every_email(agent):
+    rule = EmailRule(match_prompt="Invoices from subscription services like iTunes, Netflix")
+    emails = [make_email(message_id=f"m{i}", subject=f"Subject {i}") for i in range(25)]
+    assert agent.prefilter_emails(rule, emails) == emails
+
+
+@pytest.mark.parametrize("fields", [
+    {"subject": "Your NETFLIX receipt"},
+    {"sender_email": "billing@netflix.com"},
+    {"sender_name": "Netflix Billing"},
+    {"body_preview": "Thanks for your Netflix payment"},
+])
+def test_matching_email_is_never_dropped(agent, fields):
+    rule = EmailRule(match_prompt='Receipts from "Netflix" or "Spotify"')
+    matching = make_email(message_id="match", **fields)
+    others = [make_email(message_id=f"m{i}", subject="Lunch?") for i in range(20)]
+    kept = agent.prefilter_emails(rule, others + [matching])
+    assert kept == [matching]
+
+
+def test_prefilter_tolerates_missing_preview(agent):
+    rule = EmailRule(match_prompt='Anything from "acme"')
+    email = make_email(subject="ACME order", body_preview=None)
+    assert agent.prefilter_emails(rule, [email]) == [email]
+
+
+def counting_claude(agent, monkeypatch, delay=0.05):
+    """Replace the agent's Claude call with a slow stub; return its call list."""
+    calls = []
+
+    def call_claude_structured(messages, response_schema, max_tokens=4096):
+        calls.append(messages)
+        time.sleep(delay)
+        if "results" in response_schema["properties"]:
+            return {"results": [
+                {"id": i, "matches": True, "confidence": 90, "reason": "batch"} for i in range(50)
+            ]}
+        return {"matches": True, "confidence": 90, "reason": "single"}
+
+    monkeypatch.setattr(agent, "call_claude_structured", call_claude_structured)
+    return calls
+
+
+def test_concurrent_evaluations_share_one_call(agent, monkeypatch):
+    calls = counting_claude(agent, monkeypatch)
+    rule = EmailRule(match_prompt="Concurrent single evaluations")
+    email = make_email(subject="Hello")
+
+    async def evaluate():
+        return await asyncio.gather(*(agent.evaluate_rule(email, rule) for _ in range(5)))
+
+    results = asyncio.run(evaluate())
+    assert len(calls) == 1
+    assert all(result["reason"] == "single" for result in results)
+    # Each caller gets its own copy
+    results[0]["reason"] = "changed"
+    assert results[1]["reason"] == "single"
+
+
+def test_batch_waits_for_evaluation_in_flight(agent, monkeypatch):
+    calls = counting_claude(agent, monkeypatch)
+    rule = EmailRule(match_prompt="Batch joins a single evaluation")
+    emails = [make_email(message_id=f"m{i}", subject=f"Subject {i}") for i in range(3)]
+
+    async def evaluate():
+        single = asyncio.ensure_future(agent.evaluate_rule(emails[0], rule))
+        await asyncio.sleep(0)
+        batch = await agent.evaluate_rule_batch(rule, emails + emails[1:2])
+        return await single, batch
+
+    single, batch = asyncio.run(evaluate())
+    assert len(calls) == 2
+    # Only the two unclaimed emails went into the batch prompt
+    assert calls[1][0]["content"].count('"subject"') == 2
+    assert single["reason"] == "single"
+    assert [result["reason"] for result in batch] == ["single", "batch", "batch", "batch"]
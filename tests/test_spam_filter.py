@@ -0,0 +1,69 @@
+"""
+Tests for the spam filter heuristics and batch archiving.
+"""
+
+import asyncio
+
+import pytest
+
+from app.agents import spam_filter
+from app.agents.spam_filter import SpamFilterAgent
+from app.models import EmailRecord, EmailState
+from app.utils.matching import domain_suffixes
+
+
+@pytest.fixture
+def agent(db, monkeypatch):
+    patched = spam_filter.settings.model_copy(
+        update={"spam_sender_domains": frozenset({"example.com", "mail.example.com", "spam.test"})}
+    )
+    monkeypatch.setattr(spam_filter, "settings", patched)
+    return SpamFilterAgent(db)
+
+
+def make_email(sender_email, **kwargs) -> EmailRecord:
+    return EmailRecord.create(
+        message_id=f"m-{sender_email}", mailbox="me@example.org",
+        sender_email=sender_email, subject="Hello", **kwargs
+    )
+
+
+def test_domain_suffixes():
+    assert domain_suffixes("x@a.b.c") == ("a.b.c", "b.c", "c")
+    assert domain_suffixes("nobody") == ("nobody",)
+    assert domain_suffixes("x@trailing.") == ("trailing.",)
+
+
+@pytest.mark.parametrize("sender", [
+    "offers@example.com",
+    "offers@news.example.com",
+    "offers@a.mail.example.com",
+    "OFFERS@SPAM.TEST",
+])
+def test_spam_domain_matches_domain_and_subdomains(agent, sender):
+    score, _ = agent._heuristic_spam_score(make_email(sender))
+    assert score >= 80
+
+
+@pytest.mark.parametrize("sender", [
+    "someone@notexample.com",
+    "example.com@elsewhere.org",
+    "someone@example.com.evil.org",
+])
+def test_spam_domain_ignores_lookalikes(agent, sender):
+    score, _ = agent._heuristic_spam_score(make_email(sender))
+    assert score < 80
+
+
+def test_archive_batch_survives_save_failure(agent, db, monkeypatch):
+    email = make_email("offers@spam.test", state=EmailState.SPAM_DETECTED)
+    db.save_email(email)
+    agent._spam_batch = [email]
+
+    def fail(emails):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(db, "save_emails", fail)
+    assert asyncio.run(agent.archive_batch()) == 0
+    assert agent._spam_batch == []
+    assert db.get_email(email.id).state == EmailState.SPAM_DETECTED